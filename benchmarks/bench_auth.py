@@ -0,0 +1,79 @@
+"""
+Microbenchmark of the auth overhead per request: the fastapi_jwt_auth check
+('jwt_required' + 'get_jwt_subject') against 'token_verifier' with a cold and a warm
+claims cache.
+
+    python -m benchmarks.bench_auth --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import harness  # noqa: F401  (sets the environment)
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi_jwt_auth import AuthJWT
+from starlette.requests import Request
+
+from src.database.redis_client import redis_client
+from src.services.tokens import TokenVerifier, token_verifier
+
+
+def make_request(token: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+async def per_call_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int) -> None:
+    redis_client.connection_pool = FakeRedis(server=FakeServer()).connection_pool
+    token = AuthJWT().create_access_token(
+        subject="bench0@example.com", user_claims={"uid": 1}
+    )
+    header = f"Bearer {token}"
+    request = make_request(token)
+
+    def fastapi_jwt_auth():
+        authorize = AuthJWT(req=request)
+        authorize.jwt_required()
+        authorize.get_jwt_subject()
+
+    def cold():
+        # a cold verification also reads the revocation of the subject from Redis
+        return TokenVerifier(
+            token_verifier.secret_key,
+            token_verifier.algorithm,
+            maxsize=1,
+            client=redis_client,
+        ).verify(header)
+
+    results = {
+        "fastapi_jwt_auth": await per_call_us(fastapi_jwt_auth, iterations),
+        "token_verifier_cold": await per_call_us(cold, iterations),
+        "token_verifier_cached": await per_call_us(
+            lambda: token_verifier.verify(header), iterations
+        ),
+    }
+    for name, value in results.items():
+        print(f"{name:<24}{value:>10.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(main(parser.parse_args().iterations))
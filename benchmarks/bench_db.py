@@ -0,0 +1,92 @@
+"""
+Throughput of the database layer before and after the move to AsyncSession: a page
+of contacts read through a sync Session called straight from the coroutine (the
+former 'async def' endpoints ran their blocking queries on the event loop) against
+the same query on the app's AsyncSession, from '--concurrency' concurrent callers.
+
+Set BENCH_DATABASE_URL to Postgres to compare psycopg2 with asyncpg, on SQLite both
+paths end in sqlite3.
+
+    python -m benchmarks.bench_db --concurrency 1 10 50 --queries 2000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+
+from benchmarks import harness
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import Contact
+from src.repository.projections import CONTACT_ROW_COLUMNS
+
+
+def sync_database_url(url: str) -> str:
+    # the default sync driver of the same database
+    database_url = make_url(url)
+    database_url = database_url.set(drivername=database_url.get_backend_name())
+    return database_url.render_as_string(hide_password=False)
+
+
+async def throughput(call, concurrency: int, queries: int) -> float:
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < queries:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return queries / (time.perf_counter() - start)
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await harness.setup_app()
+    sync_engine = create_engine(
+        sync_database_url(os.environ["SQLALCHEMY_DATABASE_URL"])
+    )
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    try:
+        data = await harness.seed(harness.Scale(users=1, contacts_per_user=1000))
+        query = (
+            select(*CONTACT_ROW_COLUMNS)
+            .where(Contact.created_by == data.user_ids[0])
+            .order_by(Contact.id)
+            .limit(100)
+        )
+
+        def read_sync():
+            with SyncSession() as db:
+                return db.execute(query).all()
+
+        async def sync_session():
+            # blocks the event loop, the other callers wait for the query
+            return read_sync()
+
+        async def async_session():
+            async with harness.SessionLocal() as db:
+                return (await db.execute(query)).all()
+
+        for concurrency in args.concurrency:
+            for name, call in (
+                ("sync_session", sync_session),
+                ("async_session", async_session),
+            ):
+                rate = await throughput(call, concurrency, args.queries)
+                print(
+                    f"concurrency={concurrency:<5}{name:<16}{rate:>10.1f} queries/sec"
+                )
+    finally:
+        sync_engine.dispose()
+        await harness.teardown_app(client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--queries", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""
+Throughput of the email outbox: queues confirmation emails in fakeredis and drains
+them over plain SMTP into a local aiosmtpd server.
+
+    python -m benchmarks.bench_email --emails 2000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+SMTP_PORT = 8025
+os.environ.update(
+    MAIL_SERVER="127.0.0.1",
+    MAIL_PORT=str(SMTP_PORT),
+    MAIL_SSL_TLS="false",
+    MAIL_STARTTLS="false",
+    MAIL_USE_CREDENTIALS="false",
+)
+
+from benchmarks import harness  # noqa: F401,E402  (sets the environment)
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from fakeredis import FakeServer  # noqa: E402
+from fakeredis.aioredis import FakeRedis  # noqa: E402
+
+from src.database.redis_client import redis_client  # noqa: E402
+from src.services.email import email_outbox  # noqa: E402
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+async def main(emails: int) -> None:
+    redis_client.connection_pool = FakeRedis(server=FakeServer()).connection_pool
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=SMTP_PORT)
+    controller.start()
+    try:
+        for number in range(emails):
+            await email_outbox.enqueue(
+                f"user{number}@example.com", "Bench User", "http://benchmark/"
+            )
+        start = time.perf_counter()
+        while await email_outbox.drain():
+            pass
+        elapsed = time.perf_counter() - start
+        await email_outbox.stop()
+    finally:
+        controller.stop()
+    print(f"sent {email_outbox.sent}, failed {email_outbox.failed}, "
+          f"received {handler.received}")
+    print(f"{email_outbox.sent / elapsed:.1f} emails/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().emails))
@@ -0,0 +1,94 @@
+"""
+Memory of the streaming export: seeds one user with '--contacts' contacts, streams
+GET /api/contacts/export and reports the traced peak of the Python heap during the
+export next to the size of the response. The response is consumed chunk by chunk
+straight from the ASGI app, httpx's ASGI transport would buffer the whole body.
+
+    python -m benchmarks.bench_export --contacts 1000000 --format ndjson
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks import harness
+
+import main as app_main
+
+
+async def export(token: str, export_format: str) -> tuple[int, int]:
+    """
+    Method calls the export endpoint and discards the body chunks as they arrive.
+    :return: Tuple of the status code and the number of the body bytes.
+    """
+    status, size = 0, 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/contacts/export",
+        "raw_path": b"/api/contacts/export",
+        "query_string": f"format={export_format}".encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    requested, done = False, asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # StreamingResponse listens for the disconnect while it streams
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app_main.app(scope, receive, send)
+    return status, size
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await harness.setup_app()
+    try:
+        start = time.perf_counter()
+        data = await harness.seed(
+            harness.Scale(users=1, contacts_per_user=args.contacts)
+        )
+        print(f"seeded {args.contacts} contacts in {time.perf_counter() - start:.1f} s")
+        tokens = await harness.login(client, data.emails[0])
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        status, size = await export(tokens["access_token"], args.format)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await harness.teardown_app(client)
+    print(f"status {status}, {size / 2**20:.1f} MiB in {elapsed:.1f} s")
+    print(f"{args.contacts / elapsed:.0f} contacts/sec")
+    print(f"peak traced memory {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,82 @@
+"""
+Throughput of the bulk import: uploads '--rows' contacts with a channel value each to
+POST /api/contacts/bulk and compares the rows per second with creating
+'--baseline-rows' contacts and channels one request at a time.
+
+    python -m benchmarks.bench_import --rows 100000 --format ndjson
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import time
+
+from benchmarks import harness
+from benchmarks.run import WorkerState, create_contacts_channels
+
+from src.services.contacts_io import CSV_FIELDS
+
+
+def make_upload(rows: int, channel_id: int, import_format: str) -> bytes:
+    records = [
+        {
+            "first_name": "Bulk",
+            "last_name": f"Contact{number}",
+            "birthdate": "1990-05-17",
+            "gender": "F",
+            "persuasion": "none",
+            "channels": [
+                {"channel_id": channel_id, "channel_value": f"+381{number:09d}"}
+            ],
+        }
+        for number in range(rows)
+    ]
+    if import_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({**record, "channels": json.dumps(record["channels"])})
+        return buffer.getvalue().encode()
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await harness.setup_app()
+    try:
+        data = await harness.seed(harness.Scale(users=1, contacts_per_user=0))
+        tokens = await harness.login(client, data.emails[0])
+        state = WorkerState(data.emails[0], tokens, data)
+        upload = make_upload(args.rows, data.channel_ids["phone"], args.format)
+
+        start = time.perf_counter()
+        response = await client.post(
+            f"/api/contacts/bulk?format={args.format}",
+            headers=state.headers,
+            files={"file": (f"contacts.{args.format}", upload)},
+            timeout=None,
+        )
+        bulk_elapsed = time.perf_counter() - start
+        result = response.json()
+
+        start = time.perf_counter()
+        for _ in range(args.baseline_rows):
+            # a new contact and its channel value, like one row of the upload
+            state.contact_id = None
+            await create_contacts_channels(client, state)
+        baseline_elapsed = time.perf_counter() - start
+    finally:
+        await harness.teardown_app(client)
+    print(f"bulk: status {response.status_code}, created {result.get('created')}, "
+          f"errors {len(result.get('errors', []))}")
+    print(f"{'bulk':<12}{args.rows / bulk_elapsed:>10.0f} rows/sec")
+    print(f"{'per request':<12}{args.baseline_rows / baseline_elapsed:>10.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--baseline-rows", type=int, default=1000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,51 @@
+"""
+Login throughput against the size of the bcrypt worker pool. Every pool size serves
+'--requests' logins from '--concurrency' concurrent clients.
+
+    python -m benchmarks.bench_login --workers 1 2 4 8 --requests 200
+"""
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks import harness
+from benchmarks.run import WorkerState, login, run_scenario
+
+from src.services.auth import password_hasher
+
+
+def create_executor(kind: str, workers: int):
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await harness.setup_app()
+    try:
+        data = await harness.seed(harness.Scale(users=1, contacts_per_user=0))
+        tokens = await harness.login(client, data.emails[0])
+        state = WorkerState(data.emails[0], tokens, data)
+        # the queue limit would answer 503 to part of the concurrent logins
+        password_hasher.queue_size = max(password_hasher.queue_size, args.concurrency)
+        for workers in args.workers:
+            password_hasher.executor.shutdown(wait=True)
+            password_hasher.executor = create_executor(args.executor, workers)
+            result = await run_scenario(
+                login, [state] * args.concurrency, client, args.requests
+            )
+            print(
+                f"workers={workers:<4}{result['throughput_rps']:>10.1f} logins/sec"
+                f"  p95 {result['p95_ms']:>9.1f} ms  errors {result['errors']}"
+            )
+    finally:
+        await harness.teardown_app(client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,58 @@
+"""
+Microbenchmark of the rate limiter overhead per request against fakeredis: a lease
+of one token (a Redis call per request, like fastapi_limiter) against the default
+lease size.
+
+    python -m benchmarks.bench_rate_limit --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import harness  # noqa: F401  (sets the environment)
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from starlette.requests import Request
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services.rate_limit import RateLimiter
+
+
+def make_request() -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/contacts/",
+            "headers": [],
+            "client": ("10.0.0.1", 50000),
+        }
+    )
+
+
+async def per_call_us(limiter: RateLimiter, iterations: int) -> float:
+    request = make_request()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await limiter(request)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(iterations: int) -> None:
+    redis_client.connection_pool = FakeRedis(server=FakeServer()).connection_pool
+    times = 10**9
+    results = {}
+    for lease_size in (1, settings.rate_limit_lease_size):
+        settings.rate_limit_lease_size = lease_size
+        limiter = RateLimiter(times=times, seconds=60)
+        results[f"lease_size={lease_size}"] = await per_call_us(limiter, iterations)
+    for name, value in results.items():
+        print(f"{name:<24}{value:>10.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    asyncio.run(main(parser.parse_args().iterations))
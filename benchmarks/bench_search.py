@@ -0,0 +1,56 @@
+"""
+Latency of GET /api/contacts/search against the size of the address book. For every
+scale the database is reseeded with one user owning that many contacts, then each
+query of QUERIES is sent '--repeat' times.
+
+On SQLite the contacts are ranked in Python, set BENCH_DATABASE_URL to a Postgres
+database (with pg_trgm) to measure the indexed search.
+
+    python -m benchmarks.bench_search --scales 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import quote
+
+from benchmarks import harness
+from benchmarks.run import percentile
+
+# a prefix, a typo, a whole last name, a channel value and a miss
+QUERIES = ["olen", "kovalneko", "Shevchenko", "u1c5", "zzzz"]
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await harness.setup_app()
+    try:
+        for scale in args.scales:
+            await harness.reset_database()
+            data = await harness.seed(harness.Scale(users=1, contacts_per_user=scale))
+            tokens = await harness.login(client, data.emails[0])
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+            latencies = []
+            for query in QUERIES:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    response = await client.get(
+                        f"/api/contacts/search?q={quote(query)}&limit=20",
+                        headers=headers,
+                    )
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+            print(
+                f"contacts={scale:<10}"
+                f"p50 {percentile(latencies, 50) * 1000:>9.1f} ms  "
+                f"p95 {percentile(latencies, 95) * 1000:>9.1f} ms"
+            )
+    finally:
+        await harness.teardown_app(client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
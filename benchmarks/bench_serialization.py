@@ -0,0 +1,103 @@
+"""
+Cost of a 10k-contact list response: ORM entities validated by the Pydantic response
+model and encoded with jsonable_encoder + json (what FastAPI does for a returned
+model), against the column projections dumped with orjson. Reports the time of the
+query and of the serialization, the traced peak of the Python heap and the number of
+memory blocks the fetched result holds.
+
+    python -m benchmarks.bench_serialization --contacts 10000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks import harness
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+from src.database.models import Contact
+from src.repository.projections import CONTACT_ROW_COLUMNS, ContactRow, fetch_rows
+from src.schemas import ContactResponse
+from src.services import serialization
+
+
+async def fetch_entities(db, user_id: int) -> list:
+    result = await db.execute(select(Contact).where(Contact.created_by == user_id))
+    return result.scalars().all()
+
+
+def dump_entities(contacts: list) -> bytes:
+    models = [ContactResponse.from_orm(contact) for contact in contacts]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+async def fetch_projections(db, user_id: int) -> list:
+    query = select(*CONTACT_ROW_COLUMNS).where(Contact.created_by == user_id)
+    return await fetch_rows(db, query, ContactRow)
+
+
+PATHS = {
+    "orm_pydantic": (fetch_entities, dump_entities),
+    "rows_orjson": (fetch_projections, serialization.dump_rows),
+}
+
+
+async def measure(fetch, dump, user_id: int, repeat: int) -> dict:
+    fetch_time = dump_time = 0.0
+    for _ in range(repeat):
+        async with harness.SessionLocal() as db:
+            start = time.perf_counter()
+            rows = await fetch(db, user_id)
+            fetch_time += time.perf_counter() - start
+            start = time.perf_counter()
+            dump(rows)
+            dump_time += time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    async with harness.SessionLocal() as db:
+        rows = await fetch(db, user_id)
+        # blocks held by the result (and the session identity map) before dumping
+        snapshot = tracemalloc.take_snapshot()
+        blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+        dump(rows)
+        _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": len(rows),
+        "fetch_ms": fetch_time / repeat * 1000,
+        "dump_ms": dump_time / repeat * 1000,
+        "peak_mib": peak / 2**20,
+        "blocks": blocks,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    client = await harness.setup_app()
+    try:
+        data = await harness.seed(
+            harness.Scale(users=1, contacts_per_user=args.contacts)
+        )
+        results = {
+            name: await measure(fetch, dump, data.user_ids[0], args.repeat)
+            for name, (fetch, dump) in PATHS.items()
+        }
+    finally:
+        await harness.teardown_app(client)
+    for name, result in results.items():
+        print(
+            f"{name:<14}{result['rows']:>7} rows  fetch {result['fetch_ms']:>7.1f} ms"
+            f"  dump {result['dump_ms']:>7.1f} ms  peak {result['peak_mib']:>6.1f} MiB"
+            f"  blocks {result['blocks']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,50 @@
+"""
+Compares two result files of 'benchmarks.run', e.g. of the base and the new commit.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors", "not_modified"]
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(before: dict, after: dict) -> list[str]:
+    lines = [
+        f"{before['meta'].get('revision')} -> {after['meta'].get('revision')}",
+        f"{'scenario':<26}{'metric':<16}{'before':>12}{'after':>12}{'change':>10}",
+    ]
+    for name, result in after["results"].items():
+        base = before["results"].get(name)
+        if base is None:
+            continue
+        for metric in METRICS:
+            # result files of older revisions may lack a metric
+            before_value, after_value = base.get(metric, 0), result.get(metric, 0)
+            lines.append(
+                f"{name:<26}{metric:<16}{before_value:>12}{after_value:>12}"
+                f"{change(before_value, after_value):>10}"
+            )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print("\n".join(compare(before, after)))
+
+
+if __name__ == "__main__":
+    main()
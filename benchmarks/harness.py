@@ -0,0 +1,186 @@
+"""
+Boots the FastAPI app from 'main.py' in-process against a local database (SQLite by
+default, any URL in BENCH_DATABASE_URL) and an in-memory fakeredis server, and seeds
+synthetic users, contacts and contact channels.
+
+The module must be imported before anything from 'src', it sets the environment the
+settings are read from.
+"""
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+_database_path = os.path.join(tempfile.mkdtemp(prefix="contacts-bench-"), "bench.db")
+
+BENCH_ENV = {
+    "SQLALCHEMY_DATABASE_URL": os.environ.get(
+        "BENCH_DATABASE_URL", f"sqlite+aiosqlite:///{_database_path}"
+    ),
+    "RATE_LIMIT_REQUESTS_PER_MINUTE": str(10**9),
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "AUTHJWT_SECRET_KEY": "benchmark-secret",
+    "AUTHJWT_ALGORITHM": "HS256",
+    "CLOUDINARY_NAME": "benchmark",
+    "CLOUDINARY_API_KEY": "benchmark",
+    "CLOUDINARY_API_SECRET": "benchmark",
+    "MAIL_USERNAME": "benchmark@example.com",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+    "MAIL_PORT": "1025",
+    "MAIL_SERVER": "localhost",
+    "SECRET_KEY": "benchmark-secret",
+    "ALGORITHM": "HS256",
+}
+for _name, _value in BENCH_ENV.items():
+    os.environ.setdefault(_name, _value)
+
+import httpx  # noqa: E402
+from fakeredis import FakeServer  # noqa: E402
+from fakeredis.aioredis import FakeRedis  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+import main  # noqa: E402
+from src.database.db import SessionLocal, engine  # noqa: E402
+from src.database.models import (  # noqa: E402
+    Base,
+    Channel,
+    Contact,
+    ContactChannel,
+    User,
+)
+from src.database.redis_client import redis_client  # noqa: E402
+from src.routes import auth as auth_routes  # noqa: E402
+from src.schemas import ChannelType  # noqa: E402
+from src.services.auth import get_password_hash  # noqa: E402
+from src.utils.dates import birthday_day_of_year  # noqa: E402
+
+PASSWORD = "secret123"
+FIRST_NAMES = ["Olena", "Taras", "Iryna", "Andrii", "Maria", "Petro", "Sofia", "Ivan"]
+LAST_NAMES = ["Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko"]
+SEED_BATCH_SIZE = 10_000
+
+
+@dataclass
+class Scale:
+    users: int = 4
+    contacts_per_user: int = 1000
+    channels_per_contact: int = 1
+
+
+@dataclass
+class SeededData:
+    emails: list[str] = field(default_factory=list)
+    user_ids: list[int] = field(default_factory=list)
+    channel_ids: dict[str, int] = field(default_factory=dict)
+
+
+async def _skip_email(*args, **kwargs) -> None:
+    # confirmation emails are not sent during benchmarks
+    return None
+
+
+async def setup_app() -> httpx.AsyncClient:
+    """
+    Method creates the schema, points the shared Redis client to fakeredis, runs the
+    app startup and returns a client which calls the app in-process.
+    """
+    redis_client.connection_pool = FakeRedis(server=FakeServer()).connection_pool
+    auth_routes.send_email = _skip_email
+    await reset_database()
+    await main.app.router.startup()
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app), base_url="http://benchmark"
+    )
+
+
+async def reset_database() -> None:
+    """
+    Method recreates the schema with only the channel types in it.
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as db:
+        db.add_all([Channel(name=channel_type.value) for channel_type in ChannelType])
+        await db.commit()
+    await redis_client.flushall()
+
+
+async def teardown_app(client: httpx.AsyncClient) -> None:
+    await client.aclose()
+    await main.app.router.shutdown()
+    await engine.dispose()
+
+
+async def seed(scale: Scale, seed_value: int = 42) -> SeededData:
+    """
+    Method inserts confirmed users with synthetic contacts and channel values.
+    """
+    rnd = random.Random(seed_value)
+    data = SeededData()
+    password = get_password_hash(PASSWORD)
+    async with SessionLocal() as db:
+        channels = (await db.execute(Channel.__table__.select())).all()
+        data.channel_ids = {row.name: row.id for row in channels}
+        for user_number in range(scale.users):
+            email = f"bench{user_number}@example.com"
+            user = User(email=email, password=password, confirmed=True)
+            db.add(user)
+            await db.flush()
+            data.emails.append(email)
+            data.user_ids.append(user.id)
+
+            # inserted in batches, so a large scale doesn't build all rows at once
+            for offset in range(0, scale.contacts_per_user, SEED_BATCH_SIZE):
+                size = min(SEED_BATCH_SIZE, scale.contacts_per_user - offset)
+                contacts = []
+                for _ in range(size):
+                    birthdate = date(1960, 1, 1) + timedelta(
+                        days=rnd.randrange(365 * 40)
+                    )
+                    contacts.append(
+                        {
+                            "first_name": rnd.choice(FIRST_NAMES),
+                            "last_name": rnd.choice(LAST_NAMES),
+                            "birthdate": birthdate,
+                            "birthday_doy": birthday_day_of_year(birthdate),
+                            "gender": rnd.choice("FM"),
+                            "persuasion": "none",
+                            "created_at": datetime.now(),
+                            "created_by": user.id,
+                        }
+                    )
+                result = await db.execute(
+                    insert(Contact).returning(Contact.id, sort_by_parameter_order=True),
+                    contacts,
+                )
+                contact_ids = result.scalars().all()
+                contact_channels = [
+                    {
+                        "contact_id": contact_id,
+                        "channel_id": data.channel_ids[ChannelType.EMAIL.value],
+                        "channel_value": (
+                            f"u{user.id}c{contact_id}n{number}@example.com"
+                        ),
+                        "created_by": user.id,
+                    }
+                    for contact_id in contact_ids
+                    for number in range(scale.channels_per_contact)
+                ]
+                if contact_channels:
+                    await db.execute(insert(ContactChannel), contact_channels)
+        await db.commit()
+    return data
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    response = await client.post(
+        "/api/auth/access_token", json={"email": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,260 @@
+"""
+Load test of the API. Every scenario sends '--requests' requests from '--concurrency'
+concurrent workers and reports the latency percentiles and the throughput.
+
+    python -m benchmarks.run --users 4 --contacts 1000 --output bench.json
+    python -m benchmarks.compare before.json after.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from benchmarks import harness
+
+import httpx
+
+Scenario = Callable[[httpx.AsyncClient, "WorkerState"], Awaitable[httpx.Response]]
+
+POLL_WRITE_EVERY = 20
+
+
+class WorkerState:
+    """
+    State of one concurrent worker: its user, tokens and a counter for unique
+    values.
+    """
+
+    counter = itertools.count()
+
+    def __init__(self, email: str, tokens: dict, data: harness.SeededData):
+        self.email = email
+        self.access_token = tokens["access_token"]
+        self.refresh_token = tokens["refresh_token"]
+        self.data = data
+        self.contact_id = None
+        self.etag = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+    def unique(self) -> int:
+        return next(self.counter)
+
+
+async def read_contacts(client, state):
+    return await client.get("/api/contacts/?limit=100", headers=state.headers)
+
+
+async def read_contacts_birthdays(client, state):
+    return await client.get(
+        "/api/contacts/birthdays?daysForward=30", headers=state.headers
+    )
+
+
+async def create_contact(client, state):
+    response = await client.post(
+        "/api/contacts/",
+        headers=state.headers,
+        json={
+            "first_name": "Bench",
+            "last_name": f"Contact{state.unique()}",
+            "birthdate": "1990-05-17",
+            "gender": "F",
+            "persuasion": "none",
+            "created_at": datetime.now().isoformat(),
+        },
+    )
+    if response.status_code == 200:
+        state.contact_id = response.json()["id"]
+    return response
+
+
+async def poll_contacts(client, state):
+    # a client polling its first page, every POLL_WRITE_EVERY-th poll is followed by
+    # a write, so the next poll of the user gets the new page instead of a 304
+    headers = state.headers
+    if state.etag:
+        headers = {**headers, "If-None-Match": state.etag}
+    response = await client.get("/api/contacts/?limit=100", headers=headers)
+    if response.status_code == 200:
+        state.etag = response.headers.get("ETag")
+    if state.unique() % POLL_WRITE_EVERY == 0:
+        await create_contact(client, state)
+    return response
+
+
+async def create_contacts_channels(client, state):
+    if state.contact_id is None:
+        await create_contact(client, state)
+    return await client.post(
+        "/api/contactsChannels/",
+        headers=state.headers,
+        json={
+            "contact_id": state.contact_id,
+            "channel_id": state.data.channel_ids["phone"],
+            "channel_value": f"+380{state.unique():09d}",
+        },
+    )
+
+
+async def signup(client, state):
+    return await client.post(
+        "/api/auth/users",
+        json={"email": f"signup{state.unique()}@example.com", "password": "secret123"},
+    )
+
+
+async def login(client, state):
+    return await client.post(
+        "/api/auth/access_token",
+        json={"email": state.email, "password": harness.PASSWORD},
+    )
+
+
+async def refresh_token(client, state):
+    response = await client.get(
+        "/api/auth/refresh_token",
+        headers={"Authorization": f"Bearer {state.refresh_token}"},
+    )
+    if response.status_code == 200:
+        tokens = response.json()
+        state.access_token = tokens["access_token"]
+        state.refresh_token = tokens["refresh_token"]
+    return response
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "read_contacts": read_contacts,
+    "read_contacts_birthdays": read_contacts_birthdays,
+    "poll_contacts": poll_contacts,
+    "create_contact": create_contact,
+    "create_contacts_channels": create_contacts_channels,
+    "signup": signup,
+    "login": login,
+    "refresh_token": refresh_token,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def run_scenario(
+    scenario: Scenario, workers: list[WorkerState], client, requests: int
+) -> dict:
+    latencies, errors, not_modified = [], 0, 0
+    remaining = itertools.count()
+
+    async def worker(state: WorkerState):
+        nonlocal errors, not_modified
+        while next(remaining) < requests:
+            start = time.perf_counter()
+            response = await scenario(client, state)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            elif response.status_code == 304:
+                not_modified += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(state) for state in workers))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "not_modified": not_modified,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> dict:
+    scale = harness.Scale(
+        users=args.users,
+        contacts_per_user=args.contacts,
+        channels_per_contact=args.channels,
+    )
+    client = await harness.setup_app()
+    try:
+        data = await harness.seed(scale)
+        workers = []
+        for number in range(args.concurrency):
+            email = data.emails[number % len(data.emails)]
+            tokens = await harness.login(client, email)
+            workers.append(WorkerState(email, tokens, data))
+        results = {}
+        for name in args.scenarios:
+            requests = args.requests
+            if name == "signup":
+                # bcrypt makes signups ~100x slower than the other scenarios
+                requests = max(1, requests // 10)
+            results[name] = await run_scenario(
+                SCENARIOS[name], workers, client, requests
+            )
+            print(name, results[name])
+    finally:
+        await harness.teardown_app(client)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": os.environ["SQLALCHEMY_DATABASE_URL"].split(":")[0],
+            "scale": vars(scale),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--contacts", type=int, default=1000, help="per user")
+    parser.add_argument("--channels", type=int, default=1, help="per contact")
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--output", default="bench_output.json")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+    with open(arguments.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results are written to {arguments.output}")
@@ -1,16 +1,25 @@
-import redis.asyncio as redis
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi_jwt_auth import AuthJWT
 from fastapi_jwt_auth.exceptions import AuthJWTException, MissingTokenError
-from fastapi_limiter import FastAPILimiter
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import JSONResponse, Response
 
 from src.conf.config import settings
-from src.routes import contacts, channels, contacts_channels, auth
+from src.routes import contacts, channels, contacts_channels, auth, metrics
+from src.services import pubsub
+from src.services.auth import password_hasher
+from src.services.avatars import avatar_pipeline
+from src.services.channel_registry import channel_registry
+from src.services.email import email_outbox
+from src.services.etag import NotModified
+from src.services.metrics import MetricsMiddleware
+from src.services.profiler import QueryProfilerMiddleware
+from src.services.rate_limit import RateLimitHeadersMiddleware
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 origins = ["http://127.0.0.1:8000/"]
@@ -22,20 +31,38 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryProfilerMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
 async def startup():
-    r = await redis.Redis(
-        host=settings.redis_host, port=settings.redis_port, decode_responses=True
-    )
-    await FastAPILimiter.init(r)
+    await channel_registry.reload()
+    pubsub.start_listener()
+    email_outbox.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await pubsub.stop_listener()
+    await email_outbox.stop()
+    password_hasher.shutdown()
+    avatar_pipeline.shutdown()
 
 
 app.include_router(contacts.router, prefix="/api")
 app.include_router(channels.router, prefix="/api")
 app.include_router(contacts_channels.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
+app.include_router(metrics.router)
+
+if settings.avatar_storage == "local":
+    app.mount(
+        settings.avatar_local_url,
+        StaticFiles(directory=settings.avatar_local_dir),
+        name="avatars",
+    )
 
 
 @AuthJWT.load_config
@@ -61,5 +88,10 @@ async def missing_token_exception_handler(request: Request, exc: MissingTokenErr
     )
 
 
+@app.exception_handler(NotModified)
+async def not_modified_exception_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag})
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
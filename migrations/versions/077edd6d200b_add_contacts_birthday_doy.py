@@ -0,0 +1,34 @@
+"""add contacts birthday_doy
+
+Revision ID: 077edd6d200b
+Revises: 098f75ee6a4c
+Create Date: 2026-10-17 10:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '077edd6d200b'
+down_revision: Union[str, None] = '098f75ee6a4c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_doy', sa.SmallInteger(), nullable=True))
+    # day of the year counted in a leap year, see src.utils.dates.birthday_day_of_year
+    op.execute(
+        "UPDATE contacts SET birthday_doy = EXTRACT(DOY FROM make_date(2000, "
+        "EXTRACT(MONTH FROM birthdate)::int, EXTRACT(DAY FROM birthdate)::int)) "
+        "WHERE birthdate IS NOT NULL"
+    )
+    op.create_index('ix_contacts_created_by_birthday_doy', 'contacts', ['created_by', 'birthday_doy'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_created_by_birthday_doy', table_name='contacts')
+    op.drop_column('contacts', 'birthday_doy')
@@ -0,0 +1,39 @@
+"""add per user indexes
+
+Revision ID: 5c3f0e9a7d21
+Revises: 077edd6d200b
+Create Date: 2026-10-17 11:03:27.904415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c3f0e9a7d21'
+down_revision: Union[str, None] = '077edd6d200b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY doesn't lock the tables against writes, it can't run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contacts_created_by_last_name_first_name', 'contacts', ['created_by', 'last_name', 'first_name'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contacts_created_by_created_at_id', 'contacts', ['created_by', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contacts_channels_created_by_channel_value', 'contacts_channels', ['created_by', 'channel_value'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contacts_channels_created_by_id', 'contacts_channels', ['created_by', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contacts_channels_contact_id', 'contacts_channels', ['contact_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contacts_channels_channel_id', 'contacts_channels', ['channel_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_contacts_channels_channel_id', table_name='contacts_channels', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_channels_contact_id', table_name='contacts_channels', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_channels_created_by_id', table_name='contacts_channels', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_channels_created_by_channel_value', table_name='contacts_channels', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_created_by_created_at_id', table_name='contacts', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_created_by_last_name_first_name', table_name='contacts', postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""add contacts search indexes
+
+Revision ID: b41d8e6f2a90
+Revises: 5c3f0e9a7d21
+Create Date: 2026-10-17 12:26:58.130772
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d8e6f2a90'
+down_revision: Union[str, None] = '5c3f0e9a7d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY doesn't lock the tables against writes, it can't run in a transaction
+    with op.get_context().autocommit_block():
+        # must match src.database.models.contact_search_vector
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_contacts_search_vector ON contacts USING gin "
+            "(to_tsvector('simple', first_name || ' ' || last_name))"
+        )
+        op.create_index('ix_contacts_first_name_trgm', 'contacts', ['first_name'], unique=False, postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_contacts_last_name_trgm', 'contacts', ['last_name'], unique=False, postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_contacts_channels_channel_value_trgm', 'contacts_channels', ['channel_value'], unique=False, postgresql_using='gin', postgresql_ops={'channel_value': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_contacts_channels_channel_value_trgm', table_name='contacts_channels', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_last_name_trgm', table_name='contacts', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_first_name_trgm', table_name='contacts', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_search_vector', table_name='contacts', postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""contacts created_at not null
+
+Revision ID: e2a7c4b9d1f3
+Revises: b41d8e6f2a90
+Create Date: 2026-10-17 16:04:12.385216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4b9d1f3'
+down_revision: Union[str, None] = 'b41d8e6f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the keyset cursor compares (created_at, id), a NULL would be skipped by it
+    op.execute("UPDATE contacts SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('contacts', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('contacts', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -6,27 +6,80 @@ load_dotenv()
 
 class Settings(BaseSettings):
     sqlalchemy_database_url: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # PgBouncer in transaction mode: no client-side pool, no prepared statements
+    db_pgbouncer: bool = False
+    sql_profile_max_statements: int = 10
+    sql_profile_max_time: float = 0.5
+    sql_profile_top_n: int = 5
+    sql_profile_headers: bool = False
+
     rate_limit_requests_per_minute: int
+    rate_limit_lease_size: int = 20
+    rate_limit_local_size: int = 10000
     redis_host: str
     redis_port: int
 
+    user_cache_ttl: int = 3600
+    user_cache_local_ttl: int = 30
+    user_cache_local_size: int = 10000
+    response_cache_ttl: int = 60
+
     authjwt_secret_key: str
     authjwt_algorithm: str
+    authjwt_access_token_expires: int = 900
+    authjwt_refresh_token_expires: int = 2592000
+    token_cache_size: int = 10000
     # authjwt_token_location: str
 
     cloudinary_name: str
     cloudinary_api_key: str
     cloudinary_api_secret: str
 
+    # local, s3 or cloudinary
+    avatar_storage: str = "cloudinary"
+    avatar_size: int = 250
+    avatar_max_size: int = 5 * 1024 * 1024
+    # width x height, checked before the image is decoded
+    avatar_max_pixels: int = 50_000_000
+    avatar_workers: int = 4
+    avatar_local_dir: str = "static/avatars"
+    avatar_local_url: str = "/static/avatars"
+    avatar_s3_bucket: str | None = None
+    avatar_s3_prefix: str = "avatars/"
+    avatar_s3_region: str | None = None
+    avatar_s3_endpoint_url: str | None = None
+    avatar_s3_public_url: str | None = None
+
     mail_username: str
     mail_password: str
     mail_from: str
     mail_port: int
     mail_server: str
+    mail_from_name: str = "Rest API Application"
+    mail_ssl_tls: bool = True
+    mail_starttls: bool = False
+    mail_use_credentials: bool = True
+    mail_validate_certs: bool = True
+    mail_pool_size: int = 2
+    mail_batch_size: int = 50
+    mail_max_attempts: int = 5
+    mail_retry_backoff: float = 30
+    mail_visibility_timeout: int = 300
+    mail_poll_interval: float = 1
 
     secret_key: str
     algorithm: str
 
+    password_hash_rounds: int = 12
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64
+
     # mail_username: str
     # mail_password: str
     # mail_from: str
@@ -1,17 +1,120 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    create_async_engine,
+    async_sessionmaker,
+    AsyncSession,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from src.conf.config import settings
+from src.services import metrics, profiler
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool which records how long a checkout waits for a free connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Method returns the database URL with an async driver, so the same setting can be
+    used by Alembic (sync driver) and by the application (asyncpg).
+    :param url: Database URL from the settings.
+    :return: Database URL for the async engine.
+    """
+    database_url = make_url(url)
+    if database_url.get_backend_name() == "postgresql":
+        database_url = database_url.set(drivername="postgresql+asyncpg")
+    return database_url.render_as_string(hide_password=False)
+
+
+def create_engine_from_settings() -> AsyncEngine:
+    url = get_async_database_url(settings.sqlalchemy_database_url)
+    if make_url(url).get_backend_name() != "postgresql":
+        return create_async_engine(url)
+    if settings.db_pgbouncer:
+        return create_async_engine(
+            url,
+            poolclass=NullPool,
+            connect_args={
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                # statements of other clients live on the same server connection
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        )
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+engine = create_engine_from_settings()
+metrics.instrument_pool(engine.sync_engine.pool)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def receive_checkout(dbapi_connection, connection_record, connection_proxy):
+    metrics.DB_POOL_CHECKOUTS.inc()
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def receive_before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _finish_query(conn, statement: str) -> None:
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    operation = statement.lstrip().split(" ", 1)[0].upper()
+    metrics.DB_QUERY_DURATION.labels(operation).observe(duration)
+    profiler.record_query(statement, duration)
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def receive_after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    _finish_query(conn, statement)
+
 
+@event.listens_for(engine.sync_engine, "handle_error")
+def receive_handle_error(exception_context):
+    # a failed statement doesn't reach after_cursor_execute, its start time must
+    # not be left on the stack for the next statement of the connection
+    conn = exception_context.connection
+    if (
+        conn is not None
+        and exception_context.execution_context is not None
+        and conn.info.get("query_start_time")
+    ):
+        _finish_query(conn, exception_context.statement or "")
 
-engine = create_engine(settings.sqlalchemy_database_url)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 
 # Dependency
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
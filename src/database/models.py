@@ -2,13 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, func
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import Column, Index, Integer, SmallInteger, String, func, literal_column
+from sqlalchemy.orm import relationship, Mapped, mapped_column, validates
 from sqlalchemy.sql.schema import ForeignKey
 from sqlalchemy.sql.sqltypes import DateTime, Date, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 
 from src.schemas import ChannelType
+from src.utils.dates import birthday_day_of_year
 
 Base = declarative_base()
 
@@ -28,17 +29,39 @@ class User(Base):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_created_by_birthday_doy", "created_by", "birthday_doy"),
+        Index(
+            "ix_contacts_created_by_last_name_first_name",
+            "created_by",
+            "last_name",
+            "first_name",
+        ),
+        Index("ix_contacts_created_by_created_at_id", "created_by", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     first_name: Mapped[str] = mapped_column(String(50), nullable=False)
     last_name: Mapped[str] = mapped_column(String(50), nullable=False)
     birthdate: Mapped[str] = mapped_column(Date, nullable=True)
+    birthday_doy: Mapped[int] = mapped_column(SmallInteger, nullable=True)
     gender: Mapped[str] = mapped_column(String(1), nullable=False)
     persuasion: Mapped[str] = mapped_column(String(50), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.now
+    )
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
 
-    channels = relationship("ContactChannel", backref="contacts", passive_deletes=True)
+    # loaded explicitly with selectinload(), lazy loading would issue a query per
+    # contact (and isn't possible with AsyncSession anyway)
+    channels = relationship(
+        "ContactChannel", backref="contacts", passive_deletes=True, lazy="raise"
+    )
+
+    @validates("birthdate")
+    def validate_birthdate(self, key, birthdate):
+        self.birthday_doy = birthday_day_of_year(birthdate) if birthdate else None
+        return birthdate
 
 
 class Channel(Base):
@@ -50,6 +73,14 @@ class Channel(Base):
 
 class ContactChannel(Base):
     __tablename__ = "contacts_channels"
+    __table_args__ = (
+        Index(
+            "ix_contacts_channels_created_by_channel_value", "created_by", "channel_value"
+        ),
+        Index("ix_contacts_channels_created_by_id", "created_by", "id"),
+        Index("ix_contacts_channels_contact_id", "contact_id"),
+        Index("ix_contacts_channels_channel_id", "channel_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     contact_id: Mapped[int] = mapped_column(Integer, ForeignKey("contacts.id"))
@@ -57,3 +88,38 @@ class ContactChannel(Base):
     channel_value: Mapped[str] = mapped_column(String(250), nullable=False, unique=True)
     created_by: Mapped[int] = mapped_column(Integer, ForeignKey("users.id",
                                                                 ondelete="CASCADE"))
+
+
+def contact_search_vector():
+    """
+    Full-text document of a contact. The same expression is used by the GIN index
+    below and by the search query, otherwise Postgres won't use the index.
+    """
+    return func.to_tsvector(
+        literal_column("'simple'"),
+        Contact.first_name.op("||")(literal_column("' '")).op("||")(Contact.last_name),
+    )
+
+
+# pg_trgm/full-text indexes only exist in Postgres, other dialects search without them
+Index(
+    "ix_contacts_search_vector", contact_search_vector(), postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_contacts_first_name_trgm",
+    Contact.first_name,
+    postgresql_using="gin",
+    postgresql_ops={"first_name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_contacts_last_name_trgm",
+    Contact.last_name,
+    postgresql_using="gin",
+    postgresql_ops={"last_name": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_contacts_channels_channel_value_trgm",
+    ContactChannel.channel_value,
+    postgresql_using="gin",
+    postgresql_ops={"channel_value": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
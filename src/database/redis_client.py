@@ -0,0 +1,29 @@
+import time
+
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.services import metrics
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Redis client which records the duration of every command.
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            metrics.REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - start
+            )
+
+
+redis_client = InstrumentedRedis(host=settings.redis_host, port=settings.redis_port)
+
+
+# Dependency
+def get_redis() -> redis.Redis:
+    return redis_client
@@ -1,51 +1,44 @@
 from __future__ import annotations
 
-from typing import List, Type
+from typing import Type
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Channel, ContactChannel
-from src.schemas import (
-    ContactChannelResponse,
-    ContactResponse,
-    ContactModel,
-    ChannelModel,
-)
+from src.database.models import Channel
+from src.schemas import ChannelModel
+from src.services.channel_registry import channel_registry
 
 
-async def get_channels(db: Session) -> list[Type[Channel]]:
-    return db.query(Channel).all()
+async def get_channel(channel_id: int, db: AsyncSession) -> Type[Channel] | None:
+    result = await db.execute(select(Channel).where(Channel.id == channel_id))
+    return result.scalars().first()
 
 
-async def get_channel(channel_id: int, db: Session) -> Type[Channel] | None:
-    return db.query(Channel).filter(Channel.id == channel_id).first()
-
-
-async def get_channel_by_name(channel_name: str, db: Session) -> Type[Channel] | None:
-    return db.query(Channel).filter(Channel.name == channel_name).first()
-
-
-async def create_channel(body: ChannelModel, db: Session) -> Channel:
-    channel = Channel(name=body.name)
+async def create_channel(body: ChannelModel, db: AsyncSession) -> Channel:
+    channel = Channel(name=body.name.value)
     db.add(channel)
-    db.commit()
-    db.refresh(channel)
+    await db.commit()
+    await db.refresh(channel)
+    await channel_registry.changed(db)
     return channel
 
 
 async def update_channel(
-    channel_id: int, body: ChannelModel, db: Session
+    channel_id: int, body: ChannelModel, db: AsyncSession
 ) -> (Channel | None):
-    channel = db.query(Channel).filter(Channel.id == channel_id).first()
+    channel = await get_channel(channel_id, db)
     if channel:
-        channel.name = body.name
-        db.commit()
+        channel.name = body.name.value
+        await db.commit()
+        await channel_registry.changed(db)
     return channel
 
 
-async def remove_channel(channel_id: int, db: Session) -> Channel | None:
-    channel = db.query(Channel).filter(Channel.id == channel_id).first()
+async def remove_channel(channel_id: int, db: AsyncSession) -> Channel | None:
+    channel = await get_channel(channel_id, db)
     if channel:
-        db.delete(channel)
-        db.commit()
+        await db.delete(channel)
+        await db.commit()
+        await channel_registry.changed(db)
     return channel
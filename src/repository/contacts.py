@@ -1,63 +1,289 @@
 from __future__ import annotations
 
-from typing import List, Type
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import AsyncIterator, List, Tuple, Type
 
-from sqlalchemy import and_, extract, cast, Integer
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, func, insert, literal_column, select, tuple_, Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from src.database.models import Contact, ContactChannel
-from src.schemas import ContactModel
-from src.utils.dates import get_future_dates
+from src.database.models import (
+    Contact,
+    ContactChannel,
+    contact_search_vector,
+)
+from src.repository.projections import CONTACT_ROW_COLUMNS, ContactRow, fetch_rows
+from src.schemas import ContactModel, ContactImportModel
+from src.services.channel_registry import channel_registry
+from src.services.etag import bump_user_version
+from src.utils.dates import birthday_day_of_year, get_birthday_ranges
+from src.utils.pagination import encode_cursor, decode_cursor
 
 
-async def get_contacts(
-    db: Session,
-    user_id: int,
-    firstName: str = None,
-    lastName: str = None,
-    email: str = None,
-) -> List[Type[Contact]]:
+def _cursor_condition(cursor: str):
+    values = decode_cursor(cursor)
+    try:
+        created_at, contact_id = datetime.fromisoformat(values[0]), int(values[1])
+    except (IndexError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return tuple_(Contact.created_at, Contact.id) > tuple_(created_at, contact_id)
+
+
+def _contacts_conditions(
+    user_id: int, firstName: str, lastName: str, email: str, cursor: str
+) -> list:
     conditions = [Contact.created_by == user_id]
     if firstName:
         conditions.append(Contact.first_name == firstName)
     if lastName:
         conditions.append(Contact.last_name == lastName)
     if email:
-        conditions.append(ContactChannel.channel_value == email)
-    contacts = (
-        db.query(Contact).outerjoin(ContactChannel).filter(and_(*conditions)).all()
+        conditions.append(
+            select(ContactChannel.id)
+            .where(
+                (ContactChannel.contact_id == Contact.id)
+                & (ContactChannel.channel_value == email)
+            )
+            .exists()
+        )
+    if cursor:
+        conditions.append(_cursor_condition(cursor))
+    return conditions
+
+
+def _contacts_page(contacts: list, limit: int) -> Tuple[list, str | None]:
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = encode_cursor(contacts[-1].created_at, contacts[-1].id)
+    return contacts, next_cursor
+
+
+async def get_contacts(
+    db: AsyncSession,
+    user_id: int,
+    firstName: str = None,
+    lastName: str = None,
+    email: str = None,
+    limit: int = 100,
+    cursor: str = None,
+    include_channels: bool = False,
+) -> Tuple[List[Type[Contact]], str | None]:
+    """
+    Method returns one page of the user's contacts ordered by (created_at, id).
+    :param limit: Max number of contacts in the page.
+    :param cursor: Token of the previous page, None for the first page.
+    :param include_channels: Load the channels of the page with one extra query.
+    :return: Contacts of the page and the cursor of the next page (None for the
+    last page).
+    """
+    conditions = _contacts_conditions(user_id, firstName, lastName, email, cursor)
+    query = select(Contact)
+    if include_channels:
+        query = query.options(selectinload(Contact.channels))
+    result = await db.execute(
+        query.where(and_(*conditions))
+        .order_by(Contact.created_at, Contact.id)
+        .limit(limit + 1)
     )
-    return contacts
+    return _contacts_page(list(result.scalars().all()), limit)
+
+
+async def get_contact_rows(
+    db: AsyncSession,
+    user_id: int,
+    firstName: str = None,
+    lastName: str = None,
+    email: str = None,
+    limit: int = 100,
+    cursor: str = None,
+) -> Tuple[List[ContactRow], str | None]:
+    """
+    Read-only variant of 'get_contacts' which selects only the columns of
+    'ContactResponse' and returns lightweight 'ContactRow' objects.
+    """
+    conditions = _contacts_conditions(user_id, firstName, lastName, email, cursor)
+    contacts = await fetch_rows(
+        db,
+        select(*CONTACT_ROW_COLUMNS)
+        .where(and_(*conditions))
+        .order_by(Contact.created_at, Contact.id)
+        .limit(limit + 1),
+        ContactRow,
+    )
+    return _contacts_page(contacts, limit)
 
 
 async def get_contacts_birthdays(
-    db: Session, days: int, user_id: int
-) -> List[Type[Contact]]:
-    dates = get_future_dates(days)
-    contacts = (
-        db.query(Contact)
-        .filter(
-            (Contact.birthdate.isnot(None))
-            & cast((extract("month", Contact.birthdate)), Integer).in_(dates["month"])
-            & cast(extract("day", Contact.birthdate), Integer).in_(dates["day"])
-            & (Contact.created_by == user_id)
+    db: AsyncSession, days: int, user_id: int
+) -> List[ContactRow]:
+    ranges = get_birthday_ranges(days)
+    if not ranges:
+        return []
+    return await fetch_rows(
+        db,
+        select(*CONTACT_ROW_COLUMNS).where(
+            (Contact.created_by == user_id)
+            & or_(*(Contact.birthday_doy.between(start, end) for start, end in ranges))
+        ),
+        ContactRow,
+        yield_per=1000,
+    )
+
+
+def _similarity(value: str, q: str) -> float:
+    value = value.lower()
+    if q in value:
+        return 1.0 if value.startswith(q) else 0.8
+    return SequenceMatcher(None, value, q).ratio()
+
+
+async def _search_contacts_in_python(
+    db: AsyncSession, user_id: int, q: str, threshold: float = 0.5
+) -> List[Contact]:
+    result = await db.execute(
+        select(Contact)
+        .where(Contact.created_by == user_id)
+        .options(selectinload(Contact.channels))
+    )
+    q = q.lower()
+    ranked = []
+    for contact in result.scalars().all():
+        values = [contact.first_name, contact.last_name]
+        values.extend(channel.channel_value for channel in contact.channels)
+        score = max(_similarity(value, q) for value in values)
+        if score >= threshold:
+            ranked.append((-score, contact.id, contact))
+    ranked.sort(key=lambda item: item[:2])
+    return [contact for _, _, contact in ranked]
+
+
+async def search_contacts(
+    db: AsyncSession, user_id: int, q: str, limit: int = 20, cursor: str = None
+) -> Tuple[List[Contact], str | None]:
+    """
+    Method searches the user's contacts by names and channel values, tolerating
+    typos, and returns them ordered by relevance. Postgres uses the pg_trgm and
+    full-text GIN indexes, other databases (SQLite in tests) rank the user's contacts
+    in Python.
+    :param q: Search phrase.
+    :param limit: Max number of contacts in the page.
+    :param cursor: Token of the previous page, None for the first page.
+    :return: Contacts of the page and the cursor of the next page.
+    """
+    offset = 0
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        offset = values[0]
+
+    if db.bind.dialect.name == "postgresql":
+        vector = contact_search_vector()
+        query = func.plainto_tsquery(literal_column("'simple'"), q)
+        channel_similarity = (
+            select(func.max(func.similarity(ContactChannel.channel_value, q)))
+            .where(ContactChannel.contact_id == Contact.id)
+            .scalar_subquery()
+        )
+        channel_match = (
+            select(ContactChannel.id)
+            .where(
+                (ContactChannel.contact_id == Contact.id)
+                & (
+                    ContactChannel.channel_value.op("%")(q)
+                    | ContactChannel.channel_value.icontains(q, autoescape=True)
+                )
+            )
+            .exists()
+        )
+        rank = func.greatest(
+            func.similarity(Contact.first_name, q),
+            func.similarity(Contact.last_name, q),
+            func.coalesce(channel_similarity, 0),
+        ) + func.ts_rank(vector, query)
+        result = await db.execute(
+            select(Contact)
+            .where(
+                (Contact.created_by == user_id)
+                & (
+                    vector.op("@@")(query)
+                    | Contact.first_name.op("%")(q)
+                    | Contact.last_name.op("%")(q)
+                    | Contact.first_name.icontains(q, autoescape=True)
+                    | Contact.last_name.icontains(q, autoescape=True)
+                    | channel_match
+                )
+            )
+            .order_by(rank.desc(), Contact.id)
+            .offset(offset)
+            .limit(limit + 1)
         )
-        .all()
+        contacts = list(result.scalars().all())
+    else:
+        contacts = await _search_contacts_in_python(db, user_id, q)
+        contacts = contacts[offset : offset + limit + 1]
+
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = encode_cursor(offset + limit)
+    return contacts, next_cursor
+
+
+async def stream_contacts_with_channels(
+    db: AsyncSession, user_id: int, batch_size: int = 1000
+) -> AsyncIterator[Row]:
+    """
+    Method streams all the user's contacts joined with their channel values through
+    a server-side cursor, so memory doesn't grow with the number of rows. Rows of
+    one contact are adjacent (ordered by contact id), a contact without channels has
+    a single row with NULL channel columns.
+    :param batch_size: Number of rows fetched from the cursor at once.
+    :return: Async iterator of rows.
+    """
+    result = await db.stream(
+        select(
+            Contact.id,
+            Contact.first_name,
+            Contact.last_name,
+            Contact.birthdate,
+            Contact.gender,
+            Contact.persuasion,
+            Contact.created_at,
+            ContactChannel.channel_id,
+            ContactChannel.channel_value,
+        )
+        .outerjoin(ContactChannel, ContactChannel.contact_id == Contact.id)
+        .where(Contact.created_by == user_id)
+        .order_by(Contact.id, ContactChannel.id)
+        .execution_options(yield_per=batch_size)
     )
-    return contacts
+    async for row in result:
+        yield row
 
 
 async def get_contact(
-    contact_id: int, db: Session, user_id: int
+    contact_id: int, db: AsyncSession, user_id: int
 ) -> Type[Contact] | None:
-    return (
-        db.query(Contact)
-        .filter(and_(Contact.id == contact_id, Contact.created_by == user_id))
-        .first()
+    result = await db.execute(
+        select(Contact).where(
+            and_(Contact.id == contact_id, Contact.created_by == user_id)
+        )
     )
+    return result.scalars().first()
 
 
-async def create_contact(body: ContactModel, db: Session, user_id: int) -> Contact:
+async def create_contact(
+    body: ContactModel, db: AsyncSession, user_id: int
+) -> Contact:
     contact = Contact(
         first_name=body.first_name,
         last_name=body.last_name,
@@ -67,37 +293,124 @@ async def create_contact(body: ContactModel, db: Session, user_id: int) -> Conta
         created_by=user_id,
     )
     db.add(contact)
-    db.commit()
-    db.refresh(contact)
+    await db.commit()
+    await db.refresh(contact)
+    await bump_user_version(user_id)
     return contact
 
 
+async def bulk_create_contacts(
+    rows: List[Tuple[int, ContactImportModel]], db: AsyncSession, user_id: int
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Method inserts a chunk of validated contacts with their channel values using
+    one multi-row INSERT per table. Rows referencing an unknown channel or a channel
+    value which already exists are skipped and reported.
+    :param rows: Validated contacts keyed by the row number of the upload.
+    :return: Number of created contacts and the errors keyed by the row number.
+    """
+    values = [
+        channel.channel_value for _, contact in rows for channel in contact.channels
+    ]
+    channel_ids = channel_registry.ids()
+    taken_values = set()
+    if values:
+        taken_values = set(
+            (
+                await db.scalars(
+                    select(ContactChannel.channel_value).where(
+                        ContactChannel.channel_value.in_(values)
+                    )
+                )
+            ).all()
+        )
+
+    errors, accepted, accepted_rows = [], [], []
+    for row_number, contact in rows:
+        error, row_values = None, set()
+        for channel in contact.channels:
+            if channel.channel_id not in channel_ids:
+                error = f"Channel {channel.channel_id} is not found"
+            elif (
+                channel.channel_value in taken_values
+                or channel.channel_value in row_values
+            ):
+                error = f"Channel value '{channel.channel_value}' already exists"
+            if error:
+                break
+            row_values.add(channel.channel_value)
+        if error:
+            errors.append((row_number, error))
+            continue
+        taken_values.update(row_values)
+        accepted.append(contact)
+        accepted_rows.append(row_number)
+    if not accepted:
+        return 0, errors
+
+    try:
+        result = await db.execute(
+            insert(Contact).returning(Contact.id, sort_by_parameter_order=True),
+            [
+                {
+                    "first_name": contact.first_name,
+                    "last_name": contact.last_name,
+                    "birthdate": contact.birthdate,
+                    "birthday_doy": birthday_day_of_year(contact.birthdate),
+                    "gender": contact.gender,
+                    "persuasion": contact.persuasion,
+                    "created_at": contact.created_at,
+                    "created_by": user_id,
+                }
+                for contact in accepted
+            ],
+        )
+        contact_channels = [
+            {
+                "contact_id": contact_id,
+                "channel_id": channel.channel_id,
+                "channel_value": channel.channel_value,
+                "created_by": user_id,
+            }
+            for contact_id, contact in zip(result.scalars().all(), accepted)
+            for channel in contact.channels
+        ]
+        if contact_channels:
+            await db.execute(insert(ContactChannel), contact_channels)
+        await db.commit()
+    except IntegrityError:
+        # a channel value of the chunk was created concurrently by another request
+        await db.rollback()
+        errors.extend(
+            (row_number, "Channel value conflicts with a concurrently created one")
+            for row_number in accepted_rows
+        )
+        return 0, errors
+    await bump_user_version(user_id)
+    return len(accepted), errors
+
+
 async def update_contact(
-    contact_id: int, body: ContactModel, db: Session, user_id: int
+    contact_id: int, body: ContactModel, db: AsyncSession, user_id: int
 ) -> Contact | None:
-    contact = (
-        db.query(Contact)
-        .filter(and_(Contact.id == contact_id, Contact.created_by == user_id))
-        .first()
-    )
+    contact = await get_contact(contact_id, db, user_id)
     if contact:
         contact.first_name = body.first_name
         contact.last_name = body.last_name
         contact.persuasion = body.persuasion
         contact.gender = body.gender
-        contact.channels = body.channels
         contact.birthdate = body.birthdate
-        db.commit()
+        await db.commit()
+        await bump_user_version(user_id)
     return contact
 
 
-async def remove_contact(contact_id: int, db: Session, user_id: int) -> Contact | None:
-    contact = (
-        db.query(Contact)
-        .filter(and_(Contact.id == contact_id, Contact.created_by == user_id))
-        .first()
-    )
+async def remove_contact(
+    contact_id: int, db: AsyncSession, user_id: int
+) -> Contact | None:
+    contact = await get_contact(contact_id, db, user_id)
     if contact:
-        db.delete(contact)
-        db.commit()
+        await db.delete(contact)
+        await db.commit()
+        await bump_user_version(user_id)
     return contact
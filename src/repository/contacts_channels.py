@@ -2,94 +2,126 @@ from __future__ import annotations
 
 from typing import Type
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import ContactChannel, Channel, Contact
+from src.database.models import ContactChannel, Contact
+from src.repository.projections import (
+    CONTACT_CHANNEL_ROW_COLUMNS,
+    ContactChannelRow,
+    fetch_rows,
+)
 from src.schemas import ContactChannelModel
+from src.services.channel_registry import channel_registry
+from src.services.etag import bump_user_version
+from src.utils.pagination import encode_cursor, decode_cursor
 
 
 async def get_contacts_channels(
-    skip: int, limit: int, db: Session, user_id: int
-) -> list[Type[ContactChannel]]:
-    return (
-        db.query(ContactChannel)
-        .filter(ContactChannel.created_by == user_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    limit: int, db: AsyncSession, user_id: int, cursor: str = None
+) -> tuple[list[ContactChannelRow], str | None]:
+    """
+    Method returns one page of the user's contact channels ordered by id.
+    :param limit: Max number of contact channels in the page.
+    :param cursor: Token of the previous page, None for the first page.
+    :return: Contact channels of the page and the cursor of the next page (None for
+    the last page).
+    """
+    conditions = [ContactChannel.created_by == user_id]
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        conditions.append(ContactChannel.id > values[0])
+    contacts_channels = await fetch_rows(
+        db,
+        select(*CONTACT_CHANNEL_ROW_COLUMNS)
+        .where(and_(*conditions))
+        .order_by(ContactChannel.id)
+        .limit(limit + 1),
+        ContactChannelRow,
     )
+    next_cursor = None
+    if len(contacts_channels) > limit:
+        contacts_channels = contacts_channels[:limit]
+        next_cursor = encode_cursor(contacts_channels[-1].id)
+    return contacts_channels, next_cursor
+
+
+async def get_contact_channel(
+    contact_channel_id: int, db: AsyncSession, user_id: int
+) -> ContactChannel | None:
+    result = await db.execute(
+        select(ContactChannel).where(
+            and_(
+                ContactChannel.id == contact_channel_id,
+                ContactChannel.created_by == user_id,
+            )
+        )
+    )
+    return result.scalars().first()
 
 
 async def create_contacts_channels(
-    body: ContactChannelModel, db: Session, user_id: int
+    body: ContactChannelModel, db: AsyncSession, user_id: int
 ) -> (ContactChannel | int):
-    contact_channel = (
-        db.query(ContactChannel)
-        .filter(
+    result = await db.execute(
+        select(ContactChannel.id).where(
             and_(
                 ContactChannel.channel_value == body.channel_value,
                 ContactChannel.created_by == user_id,
             )
         )
-        .first()
     )
-    if contact_channel:
+    if result.first():
         return 1
-    channel = db.query(Channel).filter(Channel.id == body.channel_id).first()
-    contact = db.query(Contact).filter(Contact.id == body.contact_id).first()
+    channel = channel_registry.get(body.channel_id)
+    contact = await db.scalar(
+        select(Contact).where(
+            and_(Contact.id == body.contact_id, Contact.created_by == user_id)
+        )
+    )
     if channel and contact:
         contact_channel = ContactChannel(
             contact_id=body.contact_id,
             channel_id=channel.id,
             channel_value=body.channel_value,
+            created_by=user_id,
         )
         db.add(contact_channel)
-        db.commit()
-        db.refresh(contact_channel)
+        await db.commit()
+        await db.refresh(contact_channel)
+        await bump_user_version(user_id)
         return contact_channel
     else:
         return 2
 
 
 async def update_contact_channel(
-    contact_channel_id: int, body: ContactChannelModel, db: Session, user_id: int
+    contact_channel_id: int, body: ContactChannelModel, db: AsyncSession, user_id: int
 ) -> [ContactChannel]:
-    contact_channel = (
-        db.query(ContactChannel)
-        .filter(
-            and_(
-                ContactChannel.id == contact_channel_id,
-                ContactChannel.created_by == user_id,
-            )
-        )
-        .first()
-    )
+    contact_channel = await get_contact_channel(contact_channel_id, db, user_id)
     if contact_channel:
         contact_channel.contact_id = body.contact_id
         contact_channel.channel_id = body.channel_id
         contact_channel.channel_value = body.channel_value
-        db.commit()
-        db.refresh(contact_channel)
+        await db.commit()
+        await db.refresh(contact_channel)
+        await bump_user_version(user_id)
         return contact_channel
 
 
 async def remove_contact_channel(
     contact_channel_id: int,
-    db: Session,
+    db: AsyncSession,
     user_id: int,
 ) -> ContactChannel | None:
-    contact_channel = (
-        db.query(ContactChannel)
-        .filter(
-            and_(
-                ContactChannel.id == contact_channel_id,
-                ContactChannel.created_by == user_id,
-            )
-        )
-        .first()
-    )
+    contact_channel = await get_contact_channel(contact_channel_id, db, user_id)
     if contact_channel:
-        db.delete(contact_channel)
-        db.commit()
+        await db.delete(contact_channel)
+        await db.commit()
+        await bump_user_version(user_id)
     return contact_channel
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Any, Type
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Contact, ContactChannel
+
+
+@dataclass(slots=True, frozen=True)
+class ContactRow:
+    """
+    Read-only projection of a contact with the fields of 'ContactResponse'.
+    """
+
+    first_name: str
+    last_name: str
+    birthdate: date | None
+    gender: str
+    persuasion: str | None
+    created_at: datetime
+    created_by: int
+    id: int
+
+
+@dataclass(slots=True, frozen=True)
+class ContactChannelRow:
+    """
+    Read-only projection of a contact channel with the fields of
+    'ContactChannelResponse'.
+    """
+
+    contact_id: int
+    channel_id: int
+    channel_value: str
+    created_by: int
+    id: int
+
+
+# selected columns, in the order of the projection fields
+CONTACT_ROW_COLUMNS = tuple(getattr(Contact, f.name) for f in fields(ContactRow))
+CONTACT_CHANNEL_ROW_COLUMNS = tuple(
+    getattr(ContactChannel, f.name) for f in fields(ContactChannelRow)
+)
+
+
+async def fetch_rows(
+    db: AsyncSession, query: Select, row_class: Type[Any], yield_per: int = None
+) -> list:
+    """
+    Method runs a column-only select and builds a projection object per row, no ORM
+    entities are created and nothing is added to the session identity map.
+    :param query: Select of the columns of the projection, in the field order.
+    :param row_class: Projection class.
+    :param yield_per: Fetch the result through a server-side cursor in batches of
+    this size instead of buffering all the raw rows first. Use it for unbounded
+    queries.
+    :return: List of projection objects.
+    """
+    if yield_per:
+        result = await db.stream(query.execution_options(yield_per=yield_per))
+        return [row_class(*row) async for row in result]
+    result = await db.execute(query)
+    return [row_class(*row) for row in result]
@@ -1,39 +1,39 @@
 from __future__ import annotations
 
-import pickle
 from typing import Type
 
-import redis
-from fastapi import Depends, HTTPException
-from fastapi_jwt_auth import AuthJWT
+from fastapi import Depends, Header, HTTPException
 from libgravatar import Gravatar
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from src.conf.config import settings
 from src.database.db import get_db
 from src.database.models import User
 from src.schemas import UserModel
+from src.services.cache import CachedUser, user_cache
+from src.services.refresh_tokens import refresh_token_store
+from src.services.tokens import AccessClaims, token_verifier
 
 
-r = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+async def get_user_from_db(email: str, db: AsyncSession) -> User | None:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
 
-async def get_user_by_email(email: str, db: Session) -> Type[User] | bool:
-    # r.delete(f"user:{email}")
-    current_user = r.get(f"user:{email}")
+async def get_user_by_email(email: str, db: AsyncSession) -> CachedUser | None:
+    current_user = await user_cache.get(email)
     if current_user is None:
-        current_user = db.query(User).filter(User.email == email).first()
-        if current_user is None:
-            return False
-        r.set(f"user:{email}", pickle.dumps(current_user))
-        r.expire(f"user:{email}", 900)
-    else:
-        current_user = pickle.loads(current_user)
+        user = await get_user_from_db(email, db)
+        if user is None:
+            return None
+        current_user = CachedUser.from_user(user)
+        await user_cache.set(current_user)
     return current_user
 
 
-async def create_user(body: UserModel, db: Session) -> User:
+async def create_user(body: UserModel, db: AsyncSession) -> User:
     avatar = None
     try:
         g = Gravatar(body.email)
@@ -42,33 +42,61 @@ async def create_user(body: UserModel, db: Session) -> User:
         print(e)
     new_user = User(**body.dict(), avatar=avatar)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
-async def update_token(user: User, token: str | None, db: Session) -> None:
-    user.refresh_token = token
-    db.commit()
-
-
-async def get_current_user(
-    Authorize: AuthJWT = Depends(), db: Session = Depends(get_db)
-) -> Type[User]:
-    Authorize.jwt_required()
+async def update_password(user: User, password: str, db: AsyncSession) -> None:
+    user.password = password
+    await db.commit()
 
-    email = Authorize.get_jwt_subject()
 
-    return await get_user_by_email(email, db)
+async def update_token(user: User, token: str | None, db: AsyncSession) -> None:
+    user.refresh_token = token
+    await db.commit()
+    await user_cache.update(CachedUser.from_user(user))
 
 
-async def update_avatar(email: str, url: str, db: Session) -> Type[User] | None:
-    user = await get_user_by_email(email, db)
+async def get_current_user(
+    authorization: str | None = Header(None), db: AsyncSession = Depends(get_db)
+) -> AccessClaims:
+    claims = await token_verifier.verify(authorization)
+    if claims.id is not None:
+        return claims
+
+    # tokens issued before the 'uid' claim was added
+    user = await get_user_by_email(claims.email, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+    return AccessClaims(email=user.email, id=user.id, iat=claims.iat, exp=claims.exp)
+
+
+async def update_avatar(email: str, url: str, db: AsyncSession) -> Type[User] | None:
+    user = await get_user_from_db(email, db)
     user.avatar = url
-    db.commit()
+    await db.commit()
+    await user_cache.update(CachedUser.from_user(user))
     return user
 
-async def confirm_email(email: str, db: Session) -> None:
-    user = await get_user_by_email(email, db)
+
+async def confirm_email(email: str, db: AsyncSession) -> None:
+    user = await get_user_from_db(email, db)
     user.confirmed = True
-    db.commit()
+    await db.commit()
+    await user_cache.update(CachedUser.from_user(user))
+
+
+async def remove_user(email: str, db: AsyncSession) -> None:
+    result = await db.execute(
+        delete(User).where(User.email == email).returning(User.id)
+    )
+    user_ids = result.scalars().all()
+    await db.commit()
+    await user_cache.invalidate(email)
+    for user_id in user_ids:
+        await refresh_token_store.revoke_all(user_id)
+    if user_ids:
+        await token_verifier.revoke_user(email)
@@ -1,33 +1,53 @@
-import pickle
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import BinaryIO, Optional
 
-# from redis.asyncio import Redis
-import redis
-from fastapi import Header, UploadFile, File
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Request
+from fastapi import Header
+from fastapi import APIRouter, HTTPException, Depends, status, Request
 from fastapi.security import (
     HTTPBearer,
 )
 from fastapi_jwt_auth import AuthJWT
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.database.models import User
 from src.repository.users import get_current_user, get_user_by_email
 from src.schemas import UserModel, UserResponse, TokenModel, UserDb
 from src.repository import users as repository_users
-from src.services.auth import get_password_hash, get_email_from_token
+from src.services.auth import password_hasher, get_email_from_token
+from src.services.avatars import (
+    UPLOAD_REQUEST_BODY,
+    avatar_pipeline,
+    avatar_upload,
+)
+from src.services.refresh_tokens import refresh_token_store
+from src.services.tokens import AccessClaims, token_verifier
 from src.conf.config import settings
 from src.services.email import send_email
+from src.services.rate_limit import RateLimiter
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
-r = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+
+
+async def issue_tokens(
+    Authorize: AuthJWT, user_id: int, email: str, family: str
+) -> dict:
+    # 'issued_at' has sub-second precision, so a token issued right after a
+    # revocation isn't rejected by it (see 'TokenVerifier.verify')
+    access_token = Authorize.create_access_token(
+        subject=email, user_claims={"uid": user_id, "issued_at": time.time()}
+    )
+    refresh_token = Authorize.create_refresh_token(
+        subject=email, user_claims={"uid": user_id, "fam": family}
+    )
+    await refresh_token_store.add(user_id, family, Authorize.get_jti(refresh_token))
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
 
 
 @router.post(
@@ -39,19 +59,19 @@ r = redis.Redis(host=settings.redis_host, port=settings.redis_port)
         Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
     ],
 )
-async def signup(body: UserModel, background_tasks: BackgroundTasks, request: Request,
-                 Authorize: AuthJWT = Depends(), db: Session = Depends(get_db)):
+async def signup(body: UserModel, request: Request,
+                 Authorize: AuthJWT = Depends(), db: AsyncSession = Depends(get_db)):
     exist_user = await repository_users.get_user_by_email(body.email, db)
     if exist_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"User with the email {body.email} already exists",
         )
-    body.password = get_password_hash(body.password)
+    body.password = await password_hasher.hash(body.password)
     new_user = await repository_users.create_user(body, db)
-    background_tasks.add_task(
-        send_email, new_user.email, f"{new_user.first_name} {new_user.last_name}",
-        request.base_url)
+    await send_email(
+        new_user.email, f"{new_user.first_name} {new_user.last_name}", request.base_url
+    )
     return {"user": new_user,
             "detail": "User successfully created. Check your email for confirmation."}
 
@@ -65,12 +85,11 @@ async def signup(body: UserModel, background_tasks: BackgroundTasks, request: Re
         Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
     ],
 )
-async def remove_user(email: str, db: Session = Depends(get_db),
+async def remove_user(email: str, db: AsyncSession = Depends(get_db),
                       _: User = Depends(get_current_user),):
     exist_user = await repository_users.get_user_by_email(email, db)
     if exist_user:
-        db.query(User).delete()
-        db.commit()
+        await repository_users.remove_user(email, db)
 
 
 @router.post(
@@ -83,25 +102,24 @@ async def remove_user(email: str, db: Session = Depends(get_db),
     ],
 )
 async def create_session(
-    user: UserModel, Authorize: AuthJWT = Depends(), db: Session = Depends(get_db)
+    body: UserModel, Authorize: AuthJWT = Depends(), db: AsyncSession = Depends(get_db)
 ):
-    user = await get_user_by_email(user.email, db)
+    user = await repository_users.get_user_from_db(body.email, db)
     if user:
+        is_valid, new_hash = await password_hasher.verify_and_update(
+            body.password, user.password
+        )
+        if not is_valid:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        if new_hash:
+            await repository_users.update_password(user, new_hash, db)
         if not user.confirmed:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed"
             )
-        access_token = Authorize.create_access_token(subject=user.email)
-        refresh_token = Authorize.create_refresh_token(subject=user.email)
-
-        user.refresh_token = refresh_token
-        db.commit()
-
-        return {
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "token_type": "bearer",
-        }
+        return await issue_tokens(
+            Authorize, user.id, user.email, refresh_token_store.new_family()
+        )
 
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -117,29 +135,43 @@ async def create_session(
 async def refresh_token(
     refresh_token: str = Header(..., alias="Authorization"),
     Authorize: AuthJWT = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     Authorize.jwt_refresh_token_required()
-    # Check if refresh token is in DB
-    user_email = Authorize.get_jwt_subject()
-    user = db.query(User).filter(and_(user_email == User.email)).first()
-    if f"Bearer {user.refresh_token}" == refresh_token:
-        access_token = Authorize.create_access_token(subject=user_email)
-        new_refresh_token = Authorize.create_refresh_token(subject=user_email)
-
-        user.refresh_token = new_refresh_token
-        db.commit()
-        return {
-            "access_token": access_token,
-            "refresh_token": new_refresh_token,
-            "token_type": "bearer",
-        }
+    # Check if refresh token is in the store
+    claims = Authorize.get_raw_jwt()
+    user_email = claims["sub"]
+    if "fam" in claims:
+        user_id, family = claims["uid"], claims["fam"]
+        if await refresh_token_store.rotate(user_id, family, claims["jti"]):
+            return await issue_tokens(Authorize, user_id, user_email, family)
+    else:
+        # tokens issued before the store was added are checked against the DB once
+        user = await repository_users.get_user_from_db(user_email, db)
+        if user and f"Bearer {user.refresh_token}" == refresh_token:
+            await repository_users.update_token(user, None, db)
+            return await issue_tokens(
+                Authorize, user.id, user_email, refresh_token_store.new_family()
+            )
 
     raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
 
+@router.delete(
+    "/sessions",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
+    dependencies=[
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+    ],
+)
+async def revoke_sessions(current_user: AccessClaims = Depends(get_current_user)):
+    await refresh_token_store.revoke_all(current_user.id)
+    await token_verifier.revoke_user(current_user.email)
+
+
 @router.get('/confirmed_email/{token}')
-async def confirmed_email(token: str, db: Session = Depends(get_db)):
+async def confirmed_email(token: str, db: AsyncSession = Depends(get_db)):
     email = await get_email_from_token(token)
     user = await repository_users.get_user_by_email(email, db)
     if user is None:
@@ -158,24 +190,19 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
     dependencies=[
         Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
     ],
+    openapi_extra={"requestBody": UPLOAD_REQUEST_BODY},
 )
 async def update_avatar_user(
-    file: UploadFile = File(),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    # the token is checked before the body is received
+    current_user: AccessClaims = Depends(get_current_user),
+    file: BinaryIO = Depends(avatar_upload),
+    db: AsyncSession = Depends(get_db),
 ):
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
-
-    r = cloudinary.uploader.upload(
-        file.file, public_id=f"ContactsApp/{current_user.email}", overwrite=True
-    )
-    src_url = cloudinary.CloudinaryImage(f"ContactsApp/{current_user.email}").build_url(
-        width=250, height=250, crop="fill", version=r.get("version")
-    )
-    user = await repository_users.update_avatar(current_user.email, src_url, db)
-    return user
+    # the file is named by the id of the stored user, not by a claim of the token
+    user = await repository_users.get_user_by_email(current_user.email, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+    src_url = await avatar_pipeline.upload(user.id, file)
+    return await repository_users.update_avatar(user.email, src_url, db)
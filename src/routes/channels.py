@@ -1,8 +1,7 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
 from src.database.db import get_db
@@ -10,6 +9,9 @@ from src.database.models import User
 from src.repository.users import get_current_user
 from src.schemas import ChannelResponse, ChannelModel
 from src.repository import channels as repository_channels
+from src.services.channel_registry import channel_registry
+from src.services.etag import etag_matches
+from src.services.rate_limit import RateLimiter
 
 router = APIRouter(prefix="/channels", tags=["channels"])
 
@@ -23,11 +25,15 @@ router = APIRouter(prefix="/channels", tags=["channels"])
     ],
 )
 async def read_channels(
-    db: Session = Depends(get_db),
+    request: Request,
     _: User = Depends(get_current_user),
 ):
-    channels = await repository_channels.get_channels(db)
-    return channels
+    headers = {"ETag": channel_registry.etag}
+    if etag_matches(channel_registry.etag, request.headers.get("if-none-match")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=channel_registry.body, media_type="application/json", headers=headers
+    )
 
 
 @router.get(
@@ -40,10 +46,9 @@ async def read_channels(
 )
 async def read_channel(
     channelId: int,
-    db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    channel = await repository_channels.get_channel(channelId, db)
+    channel = channel_registry.get(channelId)
     if channel is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Channel not found"
@@ -61,10 +66,10 @@ async def read_channel(
 )
 async def create_channel(
     body: ChannelModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    channel = await repository_channels.get_channel_by_name(body.name, db)
+    channel = channel_registry.get_by_name(body.name.value)
     if channel:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -84,7 +89,7 @@ async def create_channel(
 async def update_channel(
     channelId: int,
     body: ChannelModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
     channel = await repository_channels.update_channel(channelId, body, db)
@@ -104,7 +109,7 @@ async def update_channel(
     ],
 )
 async def delete_channel(
-    channelId: int, db: Session = Depends(get_db), _: User = Depends(get_current_user)
+    channelId: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_user)
 ):
     channel = await repository_channels.remove_channel(channelId, db)
     if channel is None:
@@ -1,8 +1,9 @@
-from typing import List
+from typing import List, Literal, Optional, Union
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, File, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
 from src.database.db import get_db
@@ -13,31 +14,50 @@ from src.schemas import (
     ContactResponse,
     ContactChannelResponse,
     ContactModel,
+    ContactPageResponse,
+    ContactWithChannelsPageResponse,
+    ExportFormat,
+    BulkImportResponse,
 )
 from src.repository import contacts as repository_contacts
+from src.services import contacts_io, serialization
+from src.services.etag import conditional_get
+from src.services.response_cache import cache_response
+from src.services.rate_limit import RateLimiter
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
 @router.get(
     "/",
-    response_model=List[ContactResponse],
+    response_model=Union[ContactWithChannelsPageResponse, ContactPageResponse],
     description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
     dependencies=[
-        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60)),
+        Depends(conditional_get),
     ],
 )
+@cache_response(ContactPageResponse)
 async def read_contacts(
     firstName: str = None,
     lastName: str = None,
     email: str = None,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = None,
+    include: Optional[Literal["channels"]] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    contacts = await repository_contacts.get_contacts(
-        db, current_user.id, firstName, lastName, email
+    if include == "channels":
+        contacts, next_cursor = await repository_contacts.get_contacts(
+            db, current_user.id, firstName, lastName, email, limit, cursor, True
+        )
+        return ContactWithChannelsPageResponse(items=contacts, next_cursor=next_cursor)
+    contacts, next_cursor = await repository_contacts.get_contact_rows(
+        db, current_user.id, firstName, lastName, email, limit, cursor
     )
-    return contacts
+    body = serialization.dump_page(contacts, next_cursor)
+    return serialization.json_response(body)
 
 
 @router.get(
@@ -48,15 +68,95 @@ async def read_contacts(
         Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
     ],
 )
+@cache_response(List[ContactResponse])
 async def read_contacts_birthdays(
     daysForward: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     contacts = await repository_contacts.get_contacts_birthdays(
         db, daysForward, current_user.id
     )
-    return contacts
+    body = serialization.dump_rows(contacts)
+    return serialization.json_response(body)
+
+
+@router.get(
+    "/search",
+    response_model=ContactPageResponse,
+    description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
+    dependencies=[
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+    ],
+)
+async def search_contacts(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    contacts, next_cursor = await repository_contacts.search_contacts(
+        db, current_user.id, q, limit, cursor
+    )
+    return {"items": contacts, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
+    dependencies=[
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+    ],
+)
+async def export_contacts(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    rows = repository_contacts.stream_contacts_with_channels(db, current_user.id)
+    records = contacts_io.group_contact_rows(rows)
+    return StreamingResponse(
+        contacts_io.encode_contacts(records, export_format),
+        media_type=contacts_io.MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="contacts.'
+            f'{export_format.value}"'
+        },
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkImportResponse,
+    description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
+    dependencies=[
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+    ],
+)
+async def import_contacts(
+    file: UploadFile = File(),
+    import_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    created, errors = 0, []
+    # parsing and validation are CPU-bound, each chunk is prepared in a worker thread
+    chunks = iterate_in_threadpool(contacts_io.parse_contacts(file.file, import_format))
+    async for valid, invalid in chunks:
+        errors.extend(invalid)
+        if valid:
+            result = await repository_contacts.bulk_create_contacts(
+                valid, db, current_user.id
+            )
+            created += result[0]
+            errors.extend(result[1])
+    errors.sort()
+    return {
+        "created": created,
+        "errors": [{"row": row, "error": error} for row, error in errors],
+    }
 
 
 @router.get(
@@ -64,12 +164,13 @@ async def read_contacts_birthdays(
     response_model=ContactResponse,
     description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
     dependencies=[
-        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60)),
+        Depends(conditional_get),
     ],
 )
 async def read_contact(
     contactId: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     contact = await repository_contacts.get_contact(contactId, db, current_user.id)
@@ -90,7 +191,7 @@ async def read_contact(
 )
 async def create_contact(
     body: ContactModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     return await repository_contacts.create_contact(body, db, current_user.id)
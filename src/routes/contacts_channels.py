@@ -1,8 +1,7 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
 from src.database.db import get_db
@@ -11,8 +10,13 @@ from src.repository.users import get_current_user
 from src.schemas import (
     ContactChannelModel,
     ContactChannelResponse,
+    ContactChannelPageResponse,
 )
 from src.repository import contacts_channels as repository_contacts_channels
+from src.services.etag import conditional_get
+from src.services import serialization
+from src.services.response_cache import cache_response
+from src.services.rate_limit import RateLimiter
 
 
 router = APIRouter(prefix="/contactsChannels", tags=["contactsChannels"])
@@ -20,22 +24,28 @@ router = APIRouter(prefix="/contactsChannels", tags=["contactsChannels"])
 
 @router.get(
     "/",
-    response_model=List[ContactChannelResponse],
+    response_model=ContactChannelPageResponse,
     description=f"No more than {settings.rate_limit_requests_per_minute} requests per minute",
     dependencies=[
-        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60))
+        Depends(RateLimiter(times=settings.rate_limit_requests_per_minute, seconds=60)),
+        Depends(conditional_get),
     ],
 )
+@cache_response(ContactChannelPageResponse)
 async def read_contacts_channels(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    contacts_channels = await repository_contacts_channels.get_contacts_channels(
-        skip, limit, db, current_user.id
+    (
+        contacts_channels,
+        next_cursor,
+    ) = await repository_contacts_channels.get_contacts_channels(
+        limit, db, current_user.id, cursor
     )
-    return contacts_channels
+    body = serialization.dump_page(contacts_channels, next_cursor)
+    return serialization.json_response(body)
 
 
 @router.post(
@@ -48,7 +58,7 @@ async def read_contacts_channels(
 )
 async def create_contacts_channels(
     body: ContactChannelModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     contacts_channels = await repository_contacts_channels.create_contacts_channels(
@@ -78,7 +88,7 @@ async def create_contacts_channels(
 async def update_contact_channel(
     contactChannelId: int,
     body: ContactChannelModel,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     contact_channel = await repository_contacts_channels.update_contact_channel(
@@ -102,7 +112,7 @@ async def update_contact_channel(
 )
 async def delete_contact_channel(
     contactChannelId: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     contact_channel = await repository_contacts_channels.remove_contact_channel(
@@ -13,6 +13,11 @@ class ChannelType(enum.Enum):
     POST = "post"
 
 
+class ExportFormat(enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class ChannelModel(BaseModel):
     name: ChannelType
 
@@ -38,6 +43,11 @@ class ContactChannelResponse(ContactChannelModel):
         orm_mode = True
 
 
+class ContactChannelPageResponse(BaseModel):
+    items: list[ContactChannelResponse]
+    next_cursor: Optional[str] = None
+
+
 class ContactModel(BaseModel):
     first_name: str = Field(max_length=50)
     last_name: str = Field(max_length=50)
@@ -55,6 +65,40 @@ class ContactResponse(ContactModel):
         orm_mode = True
 
 
+class ContactChannelImportModel(BaseModel):
+    channel_id: int
+    channel_value: str | EmailStr
+
+
+class ContactImportModel(ContactModel):
+    created_at: datetime = Field(default_factory=datetime.now)
+    channels: list[ContactChannelImportModel] = []
+
+
+class BulkImportError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    errors: list[BulkImportError]
+
+
+class ContactPageResponse(BaseModel):
+    items: list[ContactResponse]
+    next_cursor: Optional[str] = None
+
+
+class ContactWithChannelsResponse(ContactResponse):
+    channels: list[ContactChannelResponse]
+
+
+class ContactWithChannelsPageResponse(BaseModel):
+    items: list[ContactWithChannelsResponse]
+    next_cursor: Optional[str] = None
+
+
 class UserModel(BaseModel):
     email: EmailStr
     password: str = Field(min_length=6, max_length=10)
@@ -1,3 +1,6 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException, status
@@ -5,18 +8,91 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from src.conf.config import settings
+from src.services import metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.password_hash_rounds
+)
 
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password, hashed_password):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a bounded worker pool, so the CPU-bound
+    work doesn't block the event loop. When more than 'queue_size' calls are in
+    flight the request is rejected with 503 instead of queueing without limit.
+    """
+
+    def __init__(self, executor: Executor, queue_size: int):
+        self.executor = executor
+        self.queue_size = queue_size
+        self.in_flight = 0
+
+    async def _run(self, func, *args):
+        if self.in_flight >= self.queue_size:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            metrics.PASSWORD_HASH_DURATION.labels(func.__name__).observe(
+                time.perf_counter() - start
+            )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Method verifies the password and returns a new hash when the stored one was
+        created with outdated settings (e.g. a lower bcrypt cost factor).
+        :return: Tuple of the verification result and the new hash or None.
+        """
+        return await self._run(
+            verify_and_update_password, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_password_hasher() -> PasswordHasher:
+    if settings.password_hash_executor == "process":
+        executor = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+    else:
+        # bcrypt releases the GIL while hashing, so threads run in parallel
+        executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt"
+        )
+    return PasswordHasher(executor, settings.password_hash_queue_size)
+
+
+password_hasher = create_password_hasher()
+
+
 def create_email_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=7)
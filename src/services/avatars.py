@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, BinaryIO
+
+from fastapi import HTTPException, Request, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+from src.conf.config import settings
+
+CONTENT_TYPE = "image/jpeg"
+# room for the boundaries and the part headers around the image in the request body
+MULTIPART_OVERHEAD = 16 * 1024
+# uploads larger than this are spooled to disk, as by Starlette
+SPOOL_MAX_SIZE = 1024 * 1024
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["file"],
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        }
+    },
+}
+
+
+def too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Avatar must not exceed {max_size} bytes",
+    )
+
+
+def resize_avatar(file: BinaryIO, size: int, max_pixels: int) -> bytes:
+    """
+    Method crops the image to a square, scales it to 'size' x 'size' pixels and
+    encodes it as JPEG. Images of more than 'max_pixels' pixels are rejected before
+    they are decoded (decompression bombs).
+    """
+    try:
+        with Image.open(file) as image:
+            # 'open' has only read the header, the pixels are decoded on 'convert'
+            width, height = image.size
+            if width * height > max_pixels:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Avatar must not exceed {max_pixels} pixels",
+                )
+            image = ImageOps.exif_transpose(image)
+            avatar = ImageOps.fit(image.convert("RGB"), (size, size))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="File is not a valid image"
+        )
+    output = io.BytesIO()
+    avatar.save(output, format="JPEG", quality=85, optimize=True)
+    return output.getvalue()
+
+
+class AvatarUpload:
+    """
+    Reads the 'file' field of a multipart/form-data request into a spooled temporary
+    file and counts the bytes as they arrive. Unlike UploadFile, which Starlette
+    spools completely before the endpoint runs, a body larger than the avatar limit
+    is rejected without reading it to the end.
+    """
+
+    field_name = b"file"
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        self.size = 0
+        self.found = False
+        self._in_file = False
+        self._header_name = b""
+        self._header_value = b""
+        self._pending: list[bytes] = []
+
+    def on_part_begin(self) -> None:
+        self._in_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            _, options = parse_options_header(self._header_value)
+            # only the first 'file' part is read, other fields are skipped
+            self._in_file = options.get(b"name") == self.field_name and not self.found
+        self._header_name = self._header_value = b""
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_file:
+            return
+        self.size += end - start
+        if self.size > self.max_size:
+            raise too_large(self.max_size)
+        # written after the parser returns, a file rolled to disk is written in a
+        # worker thread
+        self._pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        self.found = self.found or self._in_file
+        self._in_file = False
+
+    async def read(self, request: Request) -> BinaryIO:
+        """
+        Method receives the request body and returns the uploaded image.
+        :param request: Request with a multipart/form-data body.
+        :return: File positioned at the start of the image.
+        """
+        max_body_size = self.max_size + MULTIPART_OVERHEAD
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_body_size:
+            raise too_large(self.max_size)
+        content_type, options = parse_options_header(
+            request.headers.get("content-type", "")
+        )
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Avatar must be sent as multipart/form-data",
+            )
+        parser = MultipartParser(
+            options[b"boundary"],
+            {
+                "on_part_begin": self.on_part_begin,
+                "on_part_data": self.on_part_data,
+                "on_part_end": self.on_part_end,
+                "on_header_field": self.on_header_field,
+                "on_header_value": self.on_header_value,
+                "on_header_end": self.on_header_end,
+            },
+        )
+        received = 0
+        try:
+            # a chunked body has no Content-Length, its size is counted as well
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_body_size:
+                    raise too_large(self.max_size)
+                parser.write(chunk)
+                for data in self._pending:
+                    if getattr(self.file, "_rolled", True):
+                        await run_in_threadpool(self.file.write, data)
+                    else:
+                        self.file.write(data)
+                self._pending.clear()
+            parser.finalize()
+        except MultipartParseError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid multipart body",
+            )
+        if not self.found:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Field 'file' is required",
+            )
+        self.file.seek(0)
+        return self.file
+
+
+async def avatar_upload(request: Request) -> AsyncIterator[BinaryIO]:
+    """
+    Dependency which provides the uploaded avatar image of the request, see
+    'AvatarUpload'. The temporary file is closed after the response.
+    """
+    upload = AvatarUpload(settings.avatar_max_size)
+    try:
+        yield await upload.read(request)
+    finally:
+        upload.file.close()
+
+
+class AvatarStorage(abc.ABC):
+    """
+    Storage backend of the avatars. 'save' is blocking, it runs in a worker thread.
+    """
+
+    @abc.abstractmethod
+    def save(self, user_id: int, data: bytes) -> str:
+        """
+        Method stores the avatar of the user, replacing the previous one.
+        :return: Public URL of the avatar.
+        """
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Stores the avatars in a directory which the app serves as static files.
+    """
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, user_id: int, data: bytes) -> str:
+        name = f"{user_id}.jpg"
+        # concurrent uploads write their own files, the last rename wins
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        ) as f:
+            f.write(data)
+        try:
+            # the temporary file is private, the avatar is served to everyone
+            os.chmod(f.name, 0o644)
+            os.replace(f.name, os.path.join(self.directory, name))
+        except OSError:
+            os.unlink(f.name)
+            raise
+        # the version busts the browser cache when the avatar changes
+        return f"{self.base_url}/{name}?v={int(time.time())}"
+
+
+class S3AvatarStorage(AvatarStorage):
+    """
+    Stores the avatars in an S3-compatible bucket.
+    """
+
+    def __init__(self):
+        import boto3
+
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.avatar_s3_endpoint_url,
+            region_name=settings.avatar_s3_region,
+        )
+        self.bucket = settings.avatar_s3_bucket
+        self.prefix = settings.avatar_s3_prefix
+        self.public_url = (
+            settings.avatar_s3_public_url
+            or f"https://{self.bucket}.s3.amazonaws.com"
+        ).rstrip("/")
+
+    def save(self, user_id: int, data: bytes) -> str:
+        key = f"{self.prefix}{user_id}.jpg"
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=CONTENT_TYPE,
+            CacheControl="public, max-age=86400",
+        )
+        return f"{self.public_url}/{key}?v={int(time.time())}"
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """
+    Uploads the avatars to Cloudinary, the client is configured once.
+    """
+
+    def __init__(self):
+        import cloudinary
+        import cloudinary.uploader
+
+        cloudinary.config(
+            cloud_name=settings.cloudinary_name,
+            api_key=settings.cloudinary_api_key,
+            api_secret=settings.cloudinary_api_secret,
+            secure=True,
+        )
+        self.uploader = cloudinary.uploader
+
+    def save(self, user_id: int, data: bytes) -> str:
+        result = self.uploader.upload(
+            data, public_id=f"ContactsApp/{user_id}", overwrite=True
+        )
+        return result["secure_url"]
+
+
+def create_avatar_storage() -> AvatarStorage:
+    if settings.avatar_storage == "local":
+        return LocalAvatarStorage(settings.avatar_local_dir, settings.avatar_local_url)
+    if settings.avatar_storage == "s3":
+        return S3AvatarStorage()
+    return CloudinaryAvatarStorage()
+
+
+class AvatarPipeline:
+    """
+    Resizes the uploaded avatar and stores it with the configured backend. Decoding,
+    resizing and the upload to the storage run in a thread pool, so a large upload
+    doesn't block the event loop.
+    """
+
+    def __init__(self, storage: AvatarStorage, executor: ThreadPoolExecutor):
+        self.storage = storage
+        self.executor = executor
+
+    def process(self, user_id: int, file: BinaryIO) -> str:
+        avatar = resize_avatar(file, settings.avatar_size, settings.avatar_max_pixels)
+        return self.storage.save(user_id, avatar)
+
+    async def upload(self, user_id: int, file: BinaryIO) -> str:
+        """
+        Method stores the uploaded image as the avatar of the user.
+        :param user_id: Id of the user.
+        :param file: Uploaded image, its size is checked by 'avatar_upload'.
+        :return: Public URL of the avatar.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.process, user_id, file)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_avatar_pipeline() -> AvatarPipeline:
+    executor = ThreadPoolExecutor(
+        max_workers=settings.avatar_workers, thread_name_prefix="avatar"
+    )
+    return AvatarPipeline(create_avatar_storage(), executor)
+
+
+avatar_pipeline = create_avatar_pipeline()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Hashable
+
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services import metrics, pubsub
+
+USER_CACHE_CHANNEL = "user-cache:invalidate"
+
+
+class LocalTTLCache:
+    """
+    Process-local LRU cache whose entries expire 'ttl' seconds after they were set.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """
+    Compact projection of the 'User' row which is enough to authorize a request.
+    """
+
+    id: int
+    email: str
+    confirmed: bool
+    avatar: str | None
+
+    @classmethod
+    def from_user(cls, user) -> CachedUser:
+        return cls(
+            id=user.id,
+            email=user.email,
+            confirmed=bool(user.confirmed),
+            avatar=user.avatar,
+        )
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, data: str | bytes) -> CachedUser:
+        return cls(**json.loads(data))
+
+
+class UserCache:
+    """
+    Two-tier cache of authenticated users: a process-local TTL/LRU tier in front of
+    Redis, so hot users are served without a network round trip. Every user mutation
+    must call 'set' (write-through) or 'invalidate', both broadcast an eviction to the
+    local tiers of the other workers.
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int, local_ttl: float, local_size: int):
+        self.client = client
+        self.ttl = ttl
+        self.local = LocalTTLCache(maxsize=local_size, ttl=local_ttl)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(email: str) -> str:
+        return f"user:{email}"
+
+    async def get(self, email: str) -> CachedUser | None:
+        user = self.local.get(email)
+        if user is not None:
+            self.local_hits += 1
+            return user
+        try:
+            data = await self.client.get(self.key(email))
+        except redis.RedisError as e:
+            print(e)
+            data = None
+        if data is None:
+            self.misses += 1
+            return None
+        self.redis_hits += 1
+        user = CachedUser.loads(data)
+        self.local.set(email, user)
+        return user
+
+    async def set(self, user: CachedUser) -> None:
+        self.local.set(user.email, user)
+        try:
+            await self.client.set(self.key(user.email), user.dumps(), ex=self.ttl)
+        except redis.RedisError as e:
+            print(e)
+
+    async def update(self, user: CachedUser) -> None:
+        await self.set(user)
+        await pubsub.publish(USER_CACHE_CHANNEL, user.email)
+
+    async def invalidate(self, email: str) -> None:
+        self.local.delete(email)
+        try:
+            await self.client.delete(self.key(email))
+        except redis.RedisError as e:
+            print(e)
+        await pubsub.publish(USER_CACHE_CHANNEL, email)
+
+    def evict_local(self, email: str) -> None:
+        self.local.delete(email)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "local_size": len(self.local),
+        }
+
+
+user_cache = UserCache(
+    redis_client,
+    ttl=settings.user_cache_ttl,
+    local_ttl=settings.user_cache_local_ttl,
+    local_size=settings.user_cache_local_size,
+)
+
+pubsub.subscribe(USER_CACHE_CHANNEL, user_cache.evict_local)
+metrics.register_stats("user_cache", user_cache.stats)
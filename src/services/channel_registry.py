@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import SessionLocal
+from src.database.models import Channel
+from src.schemas import ChannelResponse
+from src.services import pubsub
+
+CHANNELS_CHANNEL = "channels:changed"
+
+
+class ChannelRegistry:
+    """
+    Process-local copy of the 'channels' lookup table. It is loaded at startup and
+    reloaded after every change of the table, the other workers are notified through
+    Redis pub/sub. The serialized list and its ETag are precomputed on load.
+    """
+
+    def __init__(self):
+        self._by_id: dict[int, ChannelResponse] = {}
+        self._by_name: dict[str, ChannelResponse] = {}
+        self.body = b"[]"
+        self.etag = self._etag(self.body)
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+    async def load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Channel).order_by(Channel.id))
+        channels = [ChannelResponse.from_orm(c) for c in result.scalars().all()]
+        body = json.dumps(
+            [{"name": c.name.value, "id": c.id} for c in channels],
+            separators=(",", ":"),
+        ).encode()
+        self._by_id = {c.id: c for c in channels}
+        self._by_name = {c.name.value: c for c in channels}
+        self.body = body
+        self.etag = self._etag(body)
+
+    async def reload(self) -> None:
+        async with SessionLocal() as db:
+            await self.load(db)
+
+    async def changed(self, db: AsyncSession) -> None:
+        """
+        Method is called after the 'channels' table was changed in the session.
+        """
+        await self.load(db)
+        await pubsub.publish(CHANNELS_CHANNEL, None)
+
+    def all(self) -> list[ChannelResponse]:
+        return list(self._by_id.values())
+
+    def get(self, channel_id: int) -> ChannelResponse | None:
+        return self._by_id.get(channel_id)
+
+    def get_by_name(self, name: str) -> ChannelResponse | None:
+        return self._by_name.get(name)
+
+    def ids(self) -> set[int]:
+        return set(self._by_id)
+
+
+channel_registry = ChannelRegistry()
+
+pubsub.subscribe(CHANNELS_CHANNEL, lambda _: channel_registry.reload())
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, BinaryIO, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import Row
+
+from src.schemas import ContactImportModel, ExportFormat
+
+CONTACT_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "birthdate",
+    "gender",
+    "persuasion",
+    "created_at",
+)
+CSV_FIELDS = CONTACT_FIELDS + ("channels",)
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def group_contact_rows(rows: AsyncIterator[Row]) -> AsyncIterator[dict]:
+    """
+    Method folds adjacent (contact, channel) rows into one record per contact with
+    the list of its channel values.
+    :param rows: Rows ordered by the contact id.
+    :return: Async iterator of contact records.
+    """
+    record = None
+    async for row in rows:
+        if record is None or record["id"] != row.id:
+            if record is not None:
+                yield record
+            record = {field: getattr(row, field) for field in CONTACT_FIELDS}
+            record["channels"] = []
+        if row.channel_value is not None:
+            record["channels"].append(
+                {"channel_id": row.channel_id, "channel_value": row.channel_value}
+            )
+    if record is not None:
+        yield record
+
+
+def _ndjson_lines(records: Iterable[dict]) -> str:
+    return "".join(
+        json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+        for record in records
+    )
+
+
+def _csv_lines(records: Iterable[dict], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    if header:
+        writer.writeheader()
+    for record in records:
+        row = dict(record)
+        for field in ("birthdate", "created_at"):
+            if row[field] is not None:
+                row[field] = row[field].isoformat()
+        row["channels"] = json.dumps(record["channels"], separators=(",", ":"))
+        writer.writerow(row)
+    return buffer.getvalue()
+
+
+async def encode_contacts(
+    records: AsyncIterator[dict], export_format: ExportFormat, chunk_size: int = 500
+) -> AsyncIterator[str]:
+    """
+    Method encodes contact records as NDJSON or CSV, yielding the output in chunks
+    of 'chunk_size' records.
+    """
+    header = export_format == ExportFormat.CSV
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            if export_format == ExportFormat.CSV:
+                yield _csv_lines(chunk, header)
+                header = False
+            else:
+                yield _ndjson_lines(chunk)
+            chunk = []
+    if export_format == ExportFormat.CSV:
+        if chunk or header:
+            yield _csv_lines(chunk, header)
+    elif chunk:
+        yield _ndjson_lines(chunk)
+
+
+def _read_records(
+    file: BinaryIO, import_format: ExportFormat
+) -> Iterator[tuple[int, dict | str]]:
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    try:
+        yield from _read_text_records(text, import_format)
+    except UnicodeDecodeError:
+        yield 0, "File is not UTF-8 encoded"
+    finally:
+        # keep the uploaded file open, it is closed by the framework
+        text.detach()
+
+
+def _read_text_records(
+    text: io.TextIOWrapper, import_format: ExportFormat
+) -> Iterator[tuple[int, dict | str]]:
+    if import_format == ExportFormat.CSV:
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            if None in row:
+                # DictReader keeps the fields beyond the header under the key None
+                yield row_number, "Row has more fields than the header"
+                continue
+            row = {key: value for key, value in row.items() if value not in ("", None)}
+            try:
+                row["channels"] = json.loads(row.get("channels", "[]"))
+            except ValueError:
+                yield row_number, "Column 'channels' must be a JSON list"
+                continue
+            yield row_number, row
+    else:
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield row_number, "Row is not valid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield row_number, "Row must be a JSON object"
+                continue
+            yield row_number, record
+
+
+def parse_contacts(
+    file: BinaryIO, import_format: ExportFormat, chunk_size: int = 1000
+) -> Iterator[tuple[list[tuple[int, ContactImportModel]], list[tuple[int, str]]]]:
+    """
+    Method reads an NDJSON or CSV upload (the format produced by the export) and
+    validates it in chunks.
+    :param file: Uploaded file.
+    :param import_format: Format of the file.
+    :param chunk_size: Number of rows validated at once.
+    :return: Iterator of chunks, each is a tuple of the valid rows and the errors,
+    both keyed by the row number.
+    """
+    valid, errors = [], []
+    for row_number, record in _read_records(file, import_format):
+        if isinstance(record, str):
+            errors.append((row_number, record))
+        else:
+            try:
+                valid.append((row_number, ContactImportModel.parse_obj(record)))
+            except (ValidationError, TypeError) as e:
+                errors.append((row_number, str(e).replace("\n", " ")))
+        if len(valid) + len(errors) >= chunk_size:
+            yield valid, errors
+            valid, errors = [], []
+    if valid or errors:
+        yield valid, errors
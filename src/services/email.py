@@ -1,42 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+import aiosmtplib
+import redis.asyncio as redis
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pydantic import EmailStr
 
 from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services import metrics
 from src.services.auth import create_email_token
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.mail_username,
-    MAIL_PASSWORD=settings.mail_password,
-    MAIL_FROM=EmailStr(settings.mail_from),
-    MAIL_PORT=settings.mail_port,
-    MAIL_SERVER=settings.mail_server,
-    MAIL_FROM_NAME="Rest API Application",
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=True,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+OUTBOX_KEY = "email:outbox"
+DELAYED_KEY = "email:outbox:delayed"
+DEAD_KEY = "email:outbox:dead"
+
+# Moves up to ARGV[2] jobs from the outbox to the delayed set with the score
+# ARGV[1] (now + visibility timeout), so a job claimed by a worker which dies before
+# the delivery is retried.
+CLAIM_SCRIPT = """
+local jobs = redis.call('LPOP', KEYS[1], ARGV[2])
+if not jobs then
+    return {}
+end
+for _, job in ipairs(jobs) do
+    redis.call('ZADD', KEYS[2], ARGV[1], job)
+end
+return jobs
+"""
+
+# Moves up to ARGV[2] jobs which are due at ARGV[1] from the delayed set back to
+# the outbox.
+PROMOTE_SCRIPT = """
+local jobs = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(jobs) do
+    redis.call('ZREM', KEYS[2], job)
+    redis.call('RPUSH', KEYS[1], job)
+end
+return #jobs
+"""
+
+templates = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    autoescape=select_autoescape(["html"]),
 )
+confirmation_template = templates.get_template("email_template.html")
 
 
-async def send_email(email: EmailStr, full_name: str, host: str):
-    try:
-        token = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "full_name": full_name,
-                "token": token,
-            },
-            subtype=MessageType.html,
+def render_confirmation(email: str, full_name: str, host: str) -> EmailMessage:
+    token = create_email_token({"sub": email})
+    message = EmailMessage()
+    message["Subject"] = "Confirm your email"
+    message["From"] = formataddr((settings.mail_from_name, settings.mail_from))
+    message["To"] = email
+    message.set_content(
+        confirmation_template.render(host=host, full_name=full_name, token=token),
+        subtype="html",
+    )
+    return message
+
+
+class SMTPPool:
+    """
+    Pool of persistent SMTP connections, a connection is opened on the first use and
+    reused by the following messages until the server drops it.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.idle: asyncio.Queue[aiosmtplib.SMTP] = asyncio.Queue()
+        self.created = 0
+
+    @staticmethod
+    def create_client() -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.mail_server,
+            port=settings.mail_port,
+            use_tls=settings.mail_ssl_tls,
+            start_tls=settings.mail_starttls,
+            validate_certs=settings.mail_validate_certs,
+            username=settings.mail_username if settings.mail_use_credentials else None,
+            password=settings.mail_password if settings.mail_use_credentials else None,
         )
 
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="email_template.html")
-    except ConnectionErrors as err:
-        print(err)
+    async def acquire(self) -> aiosmtplib.SMTP:
+        if self.idle.empty() and self.created < self.size:
+            self.created += 1
+            return self.create_client()
+        return await self.idle.get()
+
+    async def send(self, message: EmailMessage) -> None:
+        client = await self.acquire()
+        try:
+            if not client.is_connected:
+                await client.connect()
+            await client.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # the server closed the idle connection, retry once on a new one
+            client.close()
+            await client.connect()
+            await client.send_message(message)
+        finally:
+            self.idle.put_nowait(client)
+
+    async def close(self) -> None:
+        while not self.idle.empty():
+            client = self.idle.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+        self.created = 0
+
+
+class EmailOutbox:
+    """
+    Outbox of emails persisted in Redis, so a queued email survives a restart of the
+    worker. 'run' drains it in batches over a pool of persistent SMTP connections. A
+    claimed job stays in the delayed set until it is delivered, a failed delivery is
+    retried with an exponential backoff and moved to the dead letter list after
+    'max_attempts'.
+    """
+
+    def __init__(self, client: redis.Redis, pool: SMTPPool):
+        self.client = client
+        self.pool = pool
+        self.claim_script = client.register_script(CLAIM_SCRIPT)
+        self.promote_script = client.register_script(PROMOTE_SCRIPT)
+        self.sent = 0
+        self.failed = 0
+        self._worker: asyncio.Task | None = None
+
+    async def enqueue(self, email: str, full_name: str, host: str) -> None:
+        job = {
+            "id": uuid.uuid4().hex,
+            "email": email,
+            "full_name": full_name,
+            "host": host,
+            "attempts": 0,
+        }
+        await self.client.rpush(OUTBOX_KEY, json.dumps(job, separators=(",", ":")))
+
+    async def claim(self) -> list[str]:
+        now = time.time()
+        await self.promote_script(
+            keys=[OUTBOX_KEY, DELAYED_KEY], args=[now, settings.mail_batch_size]
+        )
+        return await self.claim_script(
+            keys=[OUTBOX_KEY, DELAYED_KEY],
+            args=[now + settings.mail_visibility_timeout, settings.mail_batch_size],
+        )
+
+    async def deliver(self, raw: str | bytes) -> None:
+        try:
+            job = json.loads(raw)
+        except ValueError:
+            job = None
+        if not isinstance(job, dict):
+            # a job which can't be read would fail the same way on every attempt
+            print(f"Malformed email job: {raw!r}")
+            self.failed += 1
+            await self.dead_letter(raw)
+            return
+        try:
+            message = render_confirmation(job["email"], job["full_name"], job["host"])
+            await self.pool.send(message)
+        except Exception as e:
+            # any failure (SMTP, network, template, missing field) is retried, a
+            # job must not stay claimed until its visibility timeout
+            print(e)
+            self.failed += 1
+            await self.retry(raw, job)
+            return
+        self.sent += 1
+        await self.client.zrem(DELAYED_KEY, raw)
+
+    async def dead_letter(self, raw: str | bytes) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(DELAYED_KEY, raw)
+            pipe.rpush(DEAD_KEY, raw)
+            await pipe.execute()
+
+    async def retry(self, raw: str | bytes, job: dict) -> None:
+        job["attempts"] = job.get("attempts", 0) + 1
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(DELAYED_KEY, raw)
+            if job["attempts"] >= settings.mail_max_attempts:
+                pipe.rpush(DEAD_KEY, json.dumps(job, separators=(",", ":")))
+            else:
+                due = time.time() + settings.mail_retry_backoff * 2 ** job["attempts"]
+                pipe.zadd(DELAYED_KEY, {json.dumps(job, separators=(",", ":")): due})
+            await pipe.execute()
+
+    async def drain(self) -> int:
+        """
+        Method delivers one batch of due emails.
+        :return: Number of the claimed jobs.
+        """
+        jobs = await self.claim()
+        await asyncio.gather(*(self.deliver(raw) for raw in jobs))
+        return len(jobs)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                if not await self.drain():
+                    await asyncio.sleep(settings.mail_poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(e)
+                await asyncio.sleep(settings.mail_poll_interval)
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.pool.close()
+
+    def stats(self) -> dict[str, int]:
+        return {"sent": self.sent, "failed": self.failed}
+
+
+email_outbox = EmailOutbox(redis_client, SMTPPool(settings.mail_pool_size))
+metrics.register_stats("email_outbox", email_outbox.stats)
+
+
+async def send_email(email: EmailStr, full_name: str, host: str):
+    try:
+        await email_outbox.enqueue(email, full_name, str(host))
+    except redis.RedisError as e:
+        # the signup must not fail with Redis, only the confirmation email is lost
+        print(e)
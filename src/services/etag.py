@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+
+import redis.asyncio as redis
+from fastapi import Depends, Request, Response
+
+from src.database.redis_client import redis_client
+from src.repository.users import get_current_user
+from src.services.tokens import AccessClaims
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def user_version_key(user_id: int) -> str:
+    return f"user:{user_id}:version"
+
+
+async def get_user_version(user_id: int) -> int | None:
+    """
+    Method returns the version of the user's data, it changes on every mutation of
+    the user's contacts and contact channels.
+    :return: Version number or None if Redis is unavailable.
+    """
+    try:
+        version = await redis_client.get(user_version_key(user_id))
+    except redis.RedisError as e:
+        print(e)
+        return None
+    return int(version or 0)
+
+
+async def bump_user_version(user_id: int) -> None:
+    try:
+        await redis_client.incr(user_version_key(user_id))
+    except redis.RedisError as e:
+        print(e)
+
+
+def make_etag(user_id: int, version: int, request: Request) -> str:
+    url = f"{request.url.path}?{request.url.query}".encode()
+    return f'W/"{user_id}-{version}-{hashlib.sha1(url).hexdigest()[:12]}"'
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip() for value in if_none_match.split(",")}
+    # weak comparison, as required for If-None-Match
+    return "*" in candidates or etag.removeprefix("W/") in {
+        value.removeprefix("W/") for value in candidates
+    }
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: AccessClaims = Depends(get_current_user),
+) -> None:
+    """
+    Dependency of the per-user read endpoints. It sets a weak ETag derived from the
+    user's data version and the URL, and answers 304 when the client already holds
+    it, before the endpoint runs any query.
+    """
+    version = await get_user_version(current_user.id)
+    if version is None:
+        return
+    request.state.user_version = version
+    etag = make_etag(current_user.id, version, request)
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        raise NotModified(etag)
+    response.headers["ETag"] = etag
@@ -0,0 +1,125 @@
+import time
+from typing import Callable
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.pool import Pool, QueuePool
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+HTTP_REQUESTS = Counter(
+    "http_requests", "Number of handled HTTP requests", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Number of HTTP requests being handled"
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts", "Number of connections checked out from the pool"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured number of pooled connections")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently in use")
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened above the pool size (negative if unused)"
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Time spent executing Redis commands",
+    ["command"],
+    buckets=LATENCY_BUCKETS,
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying passwords, including the wait for a worker",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def instrument_pool(pool: Pool) -> None:
+    """
+    Method exports the state of a queue pool as gauges, evaluated on every scrape.
+    """
+    if not isinstance(pool, QueuePool):
+        return
+    DB_POOL_SIZE.set_function(pool.size)
+    DB_POOL_CHECKED_OUT.set_function(pool.checkedout)
+    DB_POOL_OVERFLOW.set_function(pool.overflow)
+
+
+class StatsCollector:
+    """
+    Exports the values of a 'stats()' dict (e.g. cache hit/miss counters) as
+    gauges named '<prefix>_<key>'.
+    """
+
+    def __init__(self, prefix: str, stats: Callable[[], dict]):
+        self.prefix = prefix
+        self.stats = stats
+
+    def collect(self):
+        for key, value in self.stats().items():
+            yield GaugeMetricFamily(
+                f"{self.prefix}_{key}", f"{self.prefix} {key}", value=value
+            )
+
+
+def register_stats(prefix: str, stats: Callable[[], dict]) -> None:
+    REGISTRY.register(StatsCollector(prefix, stats))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware which records the number, latency and concurrency of HTTP
+    requests. Requests are labeled with the route template (e.g.
+    '/api/contacts/{contactId}'), not the raw path, to keep the cardinality low.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
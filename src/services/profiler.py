@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryProfile:
+    """
+    SQL statements executed while handling one request.
+    """
+
+    top_n: int = 5
+    statements: int = 0
+    total_time: float = 0.0
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+
+    def _keep_if_slow(self, item: tuple[float, str]) -> None:
+        if len(self.slowest) < self.top_n:
+            heapq.heappush(self.slowest, item)
+        elif item[0] > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.total_time += duration
+        self._keep_if_slow((duration, statement))
+
+    def merge(self, other: QueryProfile) -> None:
+        self.statements += other.statements
+        self.total_time += other.total_time
+        for item in other.slowest:
+            self._keep_if_slow(item)
+
+    def top(self) -> list[dict]:
+        return [
+            {"duration_ms": round(duration * 1000, 3), "statement": statement}
+            for duration, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+_current_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_query_profile", default=None
+)
+
+
+def record_query(statement: str, duration: float) -> None:
+    """
+    Method is called by the engine events for every executed statement.
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement, duration)
+
+
+@contextmanager
+def query_budget(max_statements: int) -> Iterator[QueryProfile]:
+    """
+    Context manager which fails when the code inside it (e.g. an in-process request
+    to the app) executes more than 'max_statements' SQL statements.
+    """
+    profile = QueryProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+    if profile.statements > max_statements:
+        raise QueryBudgetExceeded(
+            f"{profile.statements} SQL statements executed, the budget is "
+            f"{max_statements}: {profile.top()}"
+        )
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware which profiles the SQL statements of each request and logs the
+    request when it exceeds 'sql_profile_max_statements' statements or
+    'sql_profile_max_time' seconds of DB time. With 'sql_profile_headers' the
+    statement count and the DB time are returned in 'X-Query-Count' and
+    'Server-Timing' headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        parent = _current_profile.get()
+        profile = QueryProfile(top_n=settings.sql_profile_top_n)
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if (
+                message["type"] == "http.response.start"
+                and settings.sql_profile_headers
+            ):
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-query-count", str(profile.statements).encode()),
+                    (
+                        b"server-timing",
+                        f"db;dur={profile.total_time * 1000:.3f}".encode(),
+                    ),
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            if parent is not None:
+                parent.merge(profile)
+            if (
+                profile.statements > settings.sql_profile_max_statements
+                or profile.total_time > settings.sql_profile_max_time
+            ):
+                route = getattr(scope.get("route"), "path", None)
+                logger.warning(
+                    json.dumps(
+                        {
+                            "event": "sql_budget_exceeded",
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "route": route,
+                            "statements": profile.statements,
+                            "db_time_ms": round(profile.total_time * 1000, 3),
+                            "request_time_ms": round(
+                                (time.perf_counter() - start) * 1000, 3
+                            ),
+                            "slowest": profile.top(),
+                        }
+                    )
+                )
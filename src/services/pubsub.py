@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable
+
+import redis.asyncio as redis
+
+from src.database.redis_client import redis_client
+
+Handler = Callable[[Any], Awaitable[None] | None]
+
+# Messages published by this process are ignored by its own listener, the publisher
+# has already applied the change locally.
+PROCESS_ID = uuid.uuid4().hex
+
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+_listener: asyncio.Task | None = None
+
+
+def subscribe(channel: str, handler: Handler) -> None:
+    """
+    Method registers a handler which is called for every message published to the
+    channel by other workers.
+    :param channel: Name of the Redis pub/sub channel.
+    :param handler: Callable which receives the published data.
+    """
+    _handlers[channel].append(handler)
+
+
+async def publish(channel: str, data: Any) -> None:
+    message = json.dumps({"origin": PROCESS_ID, "data": data}, separators=(",", ":"))
+    try:
+        await redis_client.publish(channel, message)
+    except redis.RedisError as e:
+        print(e)
+
+
+async def _dispatch(channel: str, raw: str | bytes) -> None:
+    message = json.loads(raw)
+    if message.get("origin") == PROCESS_ID:
+        return
+    for handler in _handlers.get(channel, []):
+        result = handler(message["data"])
+        if asyncio.iscoroutine(result):
+            await result
+
+
+async def _listen() -> None:
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(*_handlers)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                await _dispatch(channel, message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(e)
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+def start_listener() -> None:
+    global _listener
+    if _listener is None and _handlers:
+        _listener = asyncio.create_task(_listen())
+
+
+async def stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
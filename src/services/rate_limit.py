@@ -0,0 +1,156 @@
+import math
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request, status
+from fastapi_jwt_auth.exceptions import AuthJWTException
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services.cache import LocalTTLCache
+from src.services.tokens import token_verifier
+
+# Refills the bucket by the time elapsed since the last call and takes up to
+# 'requested' whole tokens. Returns the number of granted tokens and the tokens left.
+TAKE_TOKENS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {granted, tostring(tokens)}
+"""
+
+_take_tokens = redis_client.register_script(TAKE_TOKENS_SCRIPT)
+
+
+@dataclass(slots=True)
+class Lease:
+    """
+    Tokens taken from the shared bucket which this worker spends locally.
+    """
+
+    tokens: int
+    bucket_tokens: float
+
+
+class RateLimiter:
+    """
+    Per-route token bucket of 'times' requests per 'seconds', kept in Redis and shared
+    by the workers. Requests with a valid access token are limited per user, others
+    per client IP. A worker takes a lease of several tokens in one Redis call and
+    spends it locally, so most requests don't touch Redis. A lease expires after the
+    time the bucket needs to refill it (at least a second), that bounds what a worker
+    can hold unused.
+
+    The state of the bucket is returned in the RateLimit-Limit, RateLimit-Remaining
+    and RateLimit-Reset headers (see 'RateLimitHeadersMiddleware').
+    """
+
+    def __init__(self, times: int, seconds: int):
+        self.times = times
+        self.seconds = seconds
+        self.rate = times / seconds
+        self.lease_size = max(1, min(settings.rate_limit_lease_size, times // 10))
+        self.leases = LocalTTLCache(
+            maxsize=settings.rate_limit_local_size,
+            ttl=max(1.0, self.lease_size / self.rate),
+        )
+
+    @staticmethod
+    async def identity(request: Request) -> str:
+        try:
+            claims = await token_verifier.verify(request.headers.get("Authorization"))
+            # tokens issued before the 'uid' claim are limited by their subject
+            if claims.id is None:
+                return f"user:{claims.email}"
+            return f"user:{claims.id}"
+        except AuthJWTException:
+            pass
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return f"ip:{forwarded.split(',')[0].strip()}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    async def key(self, request: Request) -> str:
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or request.url.path
+        return f"ratelimit:{request.method}:{path}:{await self.identity(request)}"
+
+    async def acquire(self, key: str) -> Lease | None:
+        lease = self.leases.get(key)
+        if lease is not None and lease.tokens > 0:
+            return lease
+        try:
+            granted, bucket_tokens = await _take_tokens(
+                keys=[key], args=[self.times, self.rate, self.lease_size]
+            )
+        except redis.RedisError as e:
+            print(e)
+            # the limiter doesn't take the API down with Redis
+            return None
+        lease = Lease(tokens=int(granted), bucket_tokens=float(bucket_tokens))
+        if lease.tokens:
+            self.leases.set(key, lease)
+        return lease
+
+    async def __call__(self, request: Request):
+        lease = await self.acquire(await self.key(request))
+        if lease is None:
+            return
+        if lease.tokens == 0:
+            retry_after = max(1, math.ceil((1 - lease.bucket_tokens) / self.rate))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={
+                    **self.headers(0, lease.bucket_tokens),
+                    "Retry-After": str(retry_after),
+                },
+            )
+        lease.tokens -= 1
+        remaining = lease.tokens + int(lease.bucket_tokens)
+        request.state.rate_limit_headers = self.headers(remaining, lease.bucket_tokens)
+
+    def headers(self, remaining: int, bucket_tokens: float) -> dict[str, str]:
+        reset = math.ceil((self.times - bucket_tokens) / self.rate)
+        return {
+            "RateLimit-Limit": str(self.times),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(reset),
+        }
+
+
+class RateLimitHeadersMiddleware:
+    """
+    ASGI middleware which adds the RateLimit-* headers set by 'RateLimiter' to the
+    response, also to the responses which endpoints return directly.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = scope.get("state", {}).get("rate_limit_headers")
+                if headers:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (name.lower().encode(), value.encode())
+                        for name, value in headers.items()
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
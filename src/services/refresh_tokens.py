@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import uuid
+
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+
+
+class RefreshTokenStore:
+    """
+    Redis store of the issued refresh tokens, keyed by the token 'jti' and expiring
+    with the token. Tokens of one login form a rotation family: a refresh consumes
+    the presented token and issues the next one of the family, and presenting an
+    already consumed token (reuse of a stolen token) revokes the whole family. All
+    sessions of a user are revoked in O(1) by bumping the user's generation, tokens
+    issued under an older generation are rejected.
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def token_key(jti: str) -> str:
+        return f"refresh:{jti}"
+
+    @staticmethod
+    def family_key(family: str) -> str:
+        return f"refresh:family:{family}"
+
+    @staticmethod
+    def generation_key(user_id: int) -> str:
+        return f"refresh:generation:{user_id}"
+
+    @staticmethod
+    def new_family() -> str:
+        return uuid.uuid4().hex
+
+    async def add(self, user_id: int, family: str, jti: str) -> None:
+        generation = await self.client.get(self.generation_key(user_id))
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(
+                self.token_key(jti), f"{user_id}:{int(generation or 0)}", ex=self.ttl
+            )
+            pipe.set(self.family_key(family), jti, ex=self.ttl)
+            await pipe.execute()
+
+    async def rotate(self, user_id: int, family: str, jti: str) -> bool:
+        """
+        Method consumes the refresh token, the caller issues the next token of the
+        family only if the token was valid.
+        :param user_id: User id from the token.
+        :param family: Rotation family from the token.
+        :param jti: Unique id of the token.
+        :return: True if the token was issued and not consumed or revoked yet.
+        """
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.get(self.token_key(jti))
+            pipe.delete(self.token_key(jti))
+            pipe.get(self.generation_key(user_id))
+            record, _, generation = await pipe.execute()
+        if record is None:
+            await self.revoke_family(family)
+            return False
+        if isinstance(record, bytes):
+            record = record.decode()
+        owner, token_generation = map(int, record.split(":"))
+        return owner == user_id and token_generation >= int(generation or 0)
+
+    async def revoke_family(self, family: str) -> None:
+        current = await self.client.getdel(self.family_key(family))
+        if current is not None:
+            if isinstance(current, bytes):
+                current = current.decode()
+            await self.client.delete(self.token_key(current))
+
+    async def revoke_all(self, user_id: int) -> None:
+        # the counter never expires, restarting it would give a later revocation
+        # the generation of tokens issued after the previous one
+        await self.client.incr(self.generation_key(user_id))
+
+
+refresh_token_store = RefreshTokenStore(
+    redis_client, ttl=settings.authjwt_refresh_token_expires
+)
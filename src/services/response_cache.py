@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+from datetime import date
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+import redis.asyncio as redis
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, parse_obj_as
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services import metrics
+from src.services.etag import get_user_version
+
+
+class ResponseCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_stored = 0
+
+    def as_dict(self) -> dict[str, float]:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "bytes_stored": self.bytes_stored,
+        }
+
+
+stats = ResponseCacheStats()
+metrics.register_stats("response_cache", stats.as_dict)
+
+
+def _cache_key(request: Request, user_id: int, version: int) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    # responses may depend on the current date (e.g. birthdays), so they don't
+    # outlive it
+    url = f"{date.today().isoformat()}:{request.url.path}?{query}".encode()
+    return f"response:{user_id}:{version}:{hashlib.sha1(url).hexdigest()}"
+
+
+def _serialize(result: Any, model: Any) -> bytes:
+    if isinstance(result, Response):
+        return result.body
+    if isinstance(result, BaseModel):
+        return result.json().encode()
+    return json.dumps(
+        jsonable_encoder(parse_obj_as(model, result)), separators=(",", ":")
+    ).encode()
+
+
+def cache_response(model: Any, ttl: int = None) -> Callable:
+    """
+    Decorator of a read endpoint which caches its serialized JSON body in Redis.
+    The key contains the user id, the user's data version (see
+    'src.services.etag.bump_user_version') and the normalized query, so a mutation
+    of the user's data makes the old entries unreachable, they expire after 'ttl'
+    seconds. The endpoint must take the user as the 'current_user' parameter.
+    :param model: Response model used to serialize the endpoint result.
+    :param ttl: Time to live of the cached response in seconds.
+    """
+    ttl = ttl or settings.response_cache_ttl
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(
+            *args, _cache_request: Request, _cache_response: Response, **kwargs
+        ):
+            user_id = kwargs["current_user"].id
+            version = getattr(_cache_request.state, "user_version", None)
+            if version is None:
+                version = await get_user_version(user_id)
+            # headers set by the dependencies (e.g. ETag)
+            headers = {
+                name: value
+                for name, value in _cache_response.headers.items()
+                if name not in ("content-length", "content-type")
+            }
+            key = None
+            if version is not None:
+                key = _cache_key(_cache_request, user_id, version)
+                try:
+                    body = await redis_client.get(key)
+                except redis.RedisError as e:
+                    print(e)
+                    key, body = None, None
+                if body is not None:
+                    stats.hits += 1
+                    return Response(
+                        content=body, media_type="application/json", headers=headers
+                    )
+            stats.misses += 1
+            result = await func(*args, **kwargs)
+            body = _serialize(result, model)
+            if key is not None:
+                try:
+                    await redis_client.set(key, body, ex=ttl)
+                    stats.bytes_stored += len(body)
+                except redis.RedisError as e:
+                    print(e)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        signature = inspect.signature(func)
+        wrapper.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    "_cache_request",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Request,
+                ),
+                inspect.Parameter(
+                    "_cache_response",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=Response,
+                ),
+            ]
+        )
+        return wrapper
+
+    return decorator
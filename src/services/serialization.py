@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import orjson
+from fastapi import Response
+
+
+def dump_rows(rows: Sequence[Any]) -> bytes:
+    """
+    Method serializes projection rows (see 'src.repository.projections') straight
+    to JSON, skipping the ORM identity map and the Pydantic response model
+    validation. The projection fields must match the endpoint response model.
+    :param rows: Projection dataclasses.
+    :return: JSON array of objects.
+    """
+    return orjson.dumps(rows)
+
+
+def dump_page(rows: Sequence[Any], next_cursor: str | None) -> bytes:
+    return orjson.dumps({"items": rows, "next_cursor": next_cursor})
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
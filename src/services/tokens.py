@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+
+from fastapi_jwt_auth.exceptions import (
+    AccessTokenRequired,
+    JWTDecodeError,
+    MissingTokenError,
+)
+import redis.asyncio as redis
+from jose import JWTError, jwt
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services import metrics, pubsub
+from src.services.cache import LocalTTLCache
+
+TOKEN_REVOKE_CHANNEL = "tokens:revoke"
+
+
+def revoked_key(subject: str) -> str:
+    return f"tokens:revoked:{subject}"
+
+
+@dataclass(frozen=True, slots=True)
+class AccessClaims:
+    """
+    Claims of a verified access token which are needed to authorize a request.
+    'id' is None for tokens issued before the 'uid' claim was added. 'iat' is the
+    sub-second 'issued_at' claim, tokens issued before it have the whole-second 'iat'.
+    """
+
+    email: str
+    id: int | None
+    iat: float
+    exp: int
+
+
+class TokenVerifier:
+    """
+    Verifies access tokens without fastapi_jwt_auth and keeps the decoded claims in a
+    process-local LRU keyed by the token hash until the token expires, so a token
+    reused by a client is checked and parsed only once. Tokens carry the user id
+    ('uid' claim), so an authorized request needs neither Redis nor the database.
+
+    'revoke_user' rejects the tokens of a user issued up to now until they have
+    expired. Revocations are keyed by the token subject (the email, also present in
+    the tokens without 'uid'). They are stored in Redis for the lifetime of an access
+    token and broadcast to the other workers, a worker which missed the broadcast
+    (e.g. one started later) reads the revocation when it first sees a token.
+    """
+
+    def __init__(
+        self, secret_key: str, algorithm: str, maxsize: int, client: redis.Redis
+    ):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.client = client
+        self.local = LocalTTLCache(maxsize=maxsize, ttl=0)
+        self.revoked: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def decode(self, token: str) -> AccessClaims:
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError as e:
+            raise JWTDecodeError(status_code=422, message=str(e))
+        if payload.get("type") != "access":
+            raise AccessTokenRequired(
+                status_code=422, message="Only access tokens are allowed"
+            )
+        return AccessClaims(
+            email=payload["sub"],
+            id=payload.get("uid"),
+            iat=payload.get("issued_at", payload.get("iat", 0)),
+            exp=payload["exp"],
+        )
+
+    async def verify(self, authorization: str | None) -> AccessClaims:
+        """
+        Method returns the claims of the bearer token from the Authorization header.
+        :param authorization: Value of the Authorization header.
+        :return: Claims of the token.
+        """
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme != "Bearer" or not token:
+            raise MissingTokenError(
+                status_code=401, message="Missing Authorization Header"
+            )
+        key = self.key(token)
+        claims = self.local.get(key)
+        if claims is None:
+            self.misses += 1
+            claims = self.decode(token)
+            await self.load_revocation(claims.email)
+            self.local.set(key, claims, ttl=claims.exp - time.time())
+        else:
+            self.hits += 1
+        revoked_at = self.revoked.get(claims.email)
+        if revoked_at is not None and claims.iat <= revoked_at:
+            raise JWTDecodeError(status_code=422, message="Token has been revoked")
+        return claims
+
+    async def load_revocation(self, subject: str) -> None:
+        try:
+            revoked_at = await self.client.get(revoked_key(subject))
+        except redis.RedisError as e:
+            print(e)
+            # the local revocations and the broadcasts still apply
+            return
+        if revoked_at is not None:
+            self.revoke_local(subject, float(revoked_at))
+
+    def revoke_local(self, subject: str, revoked_at: float) -> None:
+        self.revoked[subject] = max(revoked_at, self.revoked.get(subject, 0.0))
+        # revocations are kept while a token issued before them can still be valid
+        expired_before = time.time() - settings.authjwt_access_token_expires
+        for revoked_subject, at in list(self.revoked.items()):
+            if at < expired_before:
+                del self.revoked[revoked_subject]
+
+    def receive_revocation(self, data: dict) -> None:
+        self.revoke_local(data["subject"], data["revoked_at"])
+
+    async def revoke_user(self, email: str) -> None:
+        """
+        Method rejects the access tokens of the user issued until now.
+        :param email: Email of the user, the subject of the tokens.
+        """
+        revoked_at = time.time()
+        self.revoke_local(email, revoked_at)
+        try:
+            await self.client.set(
+                revoked_key(email),
+                revoked_at,
+                ex=settings.authjwt_access_token_expires,
+            )
+        except redis.RedisError as e:
+            print(e)
+        await pubsub.publish(
+            TOKEN_REVOKE_CHANNEL, {"subject": email, "revoked_at": revoked_at}
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.local),
+            "revoked": len(self.revoked),
+        }
+
+
+token_verifier = TokenVerifier(
+    secret_key=settings.authjwt_secret_key,
+    algorithm=settings.authjwt_algorithm,
+    maxsize=settings.token_cache_size,
+    client=redis_client,
+)
+
+pubsub.subscribe(TOKEN_REVOKE_CHANNEL, token_verifier.receive_revocation)
+metrics.register_stats("token_cache", token_verifier.stats)
@@ -1,20 +1,41 @@
-from collections import defaultdict
-from datetime import datetime, date, timedelta
-from typing import Any, Dict
+import calendar
+from datetime import date, timedelta
 
 
-def get_future_dates(days) -> dict[Any, set]:
+def birthday_day_of_year(birthdate: date) -> int:
     """
-    Method returns the information about next 'days' from today.
-    :return: Dict of future days and months.
+    Method returns the day of the year of the birthday counted in a leap year, so
+    February 29 has its own day (60) and the other days don't shift between years.
+    :param birthdate: Date of birth.
+    :return: Day of the year from 1 to 366.
     """
-    today_date = date.today()
-    dates = defaultdict(set)
-    for _day in range(days + 1):
-        _date: datetime.date = today_date + timedelta(days=_day)
-        dates["month"].add(_date.month)
-        dates["day"].add(_date.day)
-    return dict(dates)
+    return date(2000, birthdate.month, birthdate.day).timetuple().tm_yday
+
+
+def get_birthday_ranges(days: int, today: date | None = None) -> list[tuple[int, int]]:
+    """
+    Method returns the inclusive ranges of 'birthday_day_of_year' values of the next
+    'days' from today. A window crossing the end of the year is split in two ranges.
+    In a non-leap year the birthdays of February 29 are celebrated on February 28.
+    :param days: Number of days after today.
+    :param today: First day of the window, defaults to the current date.
+    :return: List of (first day, last day) ranges.
+    """
+    if days < 0:
+        return []
+    if days >= 365:
+        return [(1, 366)]
+    today_date = today or date.today()
+    end_date = today_date + timedelta(days=days)
+    start = birthday_day_of_year(today_date)
+    end = birthday_day_of_year(end_date)
+    if (end_date.month, end_date.day) == (2, 28) and not calendar.isleap(
+        end_date.year
+    ):
+        end += 1
+    if end_date.year != today_date.year:
+        return [(start, 366), (1, end)]
+    return [(start, end)]
 
 
 # def get_birthdays_per_week(users: dict[str, Any]) -> dict[str, list]:
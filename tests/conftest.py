@@ -0,0 +1,34 @@
+"""
+The app runs in-process against a temporary SQLite database and fakeredis, see
+'benchmarks.harness'. The data is seeded once per session, tests that write create
+their own rows.
+"""
+import pytest
+
+from benchmarks import harness
+
+SCALE = harness.Scale(users=2, contacts_per_user=5000, channels_per_contact=1)
+
+
+@pytest.fixture(scope="session")
+async def client():
+    client = await harness.setup_app()
+    yield client
+    await harness.teardown_app(client)
+
+
+@pytest.fixture(scope="session")
+async def seeded(client) -> harness.SeededData:
+    return await harness.seed(SCALE)
+
+
+@pytest.fixture(scope="session")
+async def auth_headers(client, seeded) -> dict:
+    tokens = await harness.login(client, seeded.emails[0])
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.fixture
+async def db():
+    async with harness.SessionLocal() as session:
+        yield session
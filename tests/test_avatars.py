@@ -0,0 +1,149 @@
+"""
+Avatar uploads are checked, resized to a square JPEG and stored under the id of the
+user, also for tokens issued before the 'uid' claim was added. A body over the size
+limit is rejected while it is received.
+"""
+import io
+
+import pytest
+from fastapi_jwt_auth import AuthJWT
+from PIL import Image
+
+from src.conf.config import settings
+from src.services.avatars import (
+    MULTIPART_OVERHEAD,
+    LocalAvatarStorage,
+    avatar_pipeline,
+)
+
+
+def make_image(width: int, height: int, image_format: str = "PNG") -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 90)).save(output, format=image_format)
+    return output.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch) -> LocalAvatarStorage:
+    storage = LocalAvatarStorage(str(tmp_path), "/static/avatars")
+    monkeypatch.setattr(avatar_pipeline, "storage", storage)
+    return storage
+
+
+async def upload(client, headers: dict, data: bytes):
+    return await client.patch(
+        "/api/auth/avatar", headers=headers, files={"file": ("avatar.png", data)}
+    )
+
+
+async def test_avatar_is_a_square_jpeg(
+    client, seeded, auth_headers, storage, tmp_path
+):
+    response = await upload(client, auth_headers, make_image(640, 480))
+
+    assert response.status_code == 200
+    user_id = seeded.user_ids[0]
+    assert response.json()["avatar"].startswith(f"/static/avatars/{user_id}.jpg?v=")
+    with Image.open(tmp_path / f"{user_id}.jpg") as avatar:
+        assert avatar.format == "JPEG"
+        assert avatar.size == (settings.avatar_size, settings.avatar_size) == (250, 250)
+    assert [path.name for path in tmp_path.iterdir()] == [f"{user_id}.jpg"]
+
+
+async def test_legacy_token_stores_the_avatar_of_its_user(
+    client, seeded, storage, tmp_path
+):
+    token = AuthJWT().create_access_token(subject=seeded.emails[1])
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await upload(client, headers, make_image(300, 300, "JPEG"))
+
+    assert response.status_code == 200
+    assert (tmp_path / f"{seeded.user_ids[1]}.jpg").exists()
+    assert not (tmp_path / "None.jpg").exists()
+
+
+async def test_too_large_upload_is_rejected(
+    client, seeded, auth_headers, storage, tmp_path, monkeypatch
+):
+    data = make_image(400, 400)
+    monkeypatch.setattr(settings, "avatar_max_size", len(data) - 1)
+
+    response = await upload(client, auth_headers, data)
+
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_too_large_content_length_is_rejected_before_reading(
+    client, seeded, auth_headers, storage, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "avatar_max_size", 100)
+    received = []
+
+    async def body():
+        received.append(True)
+        yield b"x" * (100 + MULTIPART_OVERHEAD + 1)
+
+    response = await client.patch(
+        "/api/auth/avatar",
+        headers={
+            **auth_headers,
+            "Content-Type": "multipart/form-data; boundary=avatar",
+            "Content-Length": str(100 + MULTIPART_OVERHEAD + 1),
+        },
+        content=body(),
+    )
+
+    assert response.status_code == 413
+    assert received == []
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_chunked_upload_is_rejected_at_the_limit(
+    client, seeded, auth_headers, storage, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "avatar_max_size", 10_000)
+    chunks = 100
+    received = []
+
+    async def body():
+        yield (
+            b"--avatar\r\nContent-Disposition: form-data; name=\"file\"; "
+            b"filename=\"avatar.png\"\r\n\r\n"
+        )
+        for _ in range(chunks):
+            received.append(True)
+            yield b"x" * 1000
+        yield b"\r\n--avatar--\r\n"
+
+    response = await client.patch(
+        "/api/auth/avatar",
+        headers={
+            **auth_headers,
+            "Content-Type": "multipart/form-data; boundary=avatar",
+        },
+        content=body(),
+    )
+
+    assert response.status_code == 413
+    assert len(received) < chunks
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_too_many_pixels_are_rejected_before_decoding(
+    client, seeded, auth_headers, storage, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "avatar_max_pixels", 100 * 100)
+
+    response = await upload(client, auth_headers, make_image(101, 100))
+
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_non_image_is_rejected(client, seeded, auth_headers, storage, tmp_path):
+    response = await upload(client, auth_headers, b"definitely not an image")
+
+    assert response.status_code == 400
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,59 @@
+import calendar
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from src.database.models import Contact
+
+
+def has_birthday_within(birthdate: date, today: date, days: int) -> bool:
+    for offset in range(days + 1):
+        day = today + timedelta(days=offset)
+        if (day.month, day.day) == (birthdate.month, birthdate.day):
+            return True
+        if (
+            (birthdate.month, birthdate.day) == (2, 29)
+            and (day.month, day.day) == (2, 28)
+            and not calendar.isleap(day.year)
+        ):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("days", [0, 7, 30, 120])
+async def test_birthdays_endpoint_matches_day_by_day_check(
+    client, seeded, auth_headers, db, days
+):
+    contacts = (
+        await db.execute(
+            select(Contact.id, Contact.birthdate).where(
+                Contact.created_by == seeded.user_ids[0]
+            )
+        )
+    ).all()
+    today = date.today()
+    expected = {
+        contact_id
+        for contact_id, birthdate in contacts
+        if has_birthday_within(birthdate, today, days)
+    }
+
+    response = await client.get(
+        f"/api/contacts/birthdays?daysForward={days}", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert {contact["id"] for contact in response.json()} == expected
+
+
+async def test_birthdays_excludes_other_users(client, seeded, auth_headers):
+    response = await client.get(
+        "/api/contacts/birthdays?daysForward=364", headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert {contact["created_by"] for contact in response.json()} == {
+        seeded.user_ids[0]
+    }
+
@@ -0,0 +1,31 @@
+"""
+The channel list is served from the in-process registry and answers 304 to any
+If-None-Match which holds its ETag, compared weakly as for the per-user lists.
+"""
+import pytest
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ["{etag}", "W/{etag}", '"other", {etag}', "*"],
+    ids=["exact", "weak", "list", "any"],
+)
+async def test_matching_etag_is_not_modified(client, auth_headers, if_none_match):
+    etag = (await client.get("/api/channels/", headers=auth_headers)).headers["ETag"]
+
+    response = await client.get(
+        "/api/channels/",
+        headers={**auth_headers, "If-None-Match": if_none_match.format(etag=etag)},
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+async def test_other_etag_gets_the_list(client, auth_headers):
+    response = await client.get(
+        "/api/channels/", headers={**auth_headers, "If-None-Match": '"other"'}
+    )
+
+    assert response.status_code == 200
+    assert {channel["name"] for channel in response.json()} >= {"email", "phone"}
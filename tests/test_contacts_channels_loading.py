@@ -0,0 +1,46 @@
+"""
+A page of contacts with their channels costs a constant number of queries: one for
+the contacts and one 'selectinload' query for the channels of the whole page.
+"""
+import pytest
+from sqlalchemy import select
+
+from src.database.models import ContactChannel
+from src.services.profiler import query_budget
+
+
+@pytest.mark.parametrize("limit", [1, 10, 250])
+async def test_include_channels_is_two_queries_for_any_page_size(
+    client, seeded, auth_headers, limit
+):
+    with query_budget(2) as profile:
+        response = await client.get(
+            f"/api/contacts/?include=channels&limit={limit}", headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == limit
+    assert all(len(item["channels"]) == 1 for item in items)
+    assert profile.statements == 2
+
+
+async def test_email_filter_does_not_duplicate_contacts(
+    client, seeded, auth_headers, db
+):
+    channel = (
+        await db.execute(
+            select(ContactChannel.contact_id, ContactChannel.channel_value)
+            .where(ContactChannel.created_by == seeded.user_ids[0])
+            .limit(1)
+        )
+    ).one()
+
+    with query_budget(1) as profile:
+        response = await client.get(
+            f"/api/contacts/?email={channel.channel_value}", headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [channel.contact_id]
+    assert profile.statements == 1
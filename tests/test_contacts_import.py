@@ -0,0 +1,70 @@
+"""
+A bulk import creates the valid rows and reports every other one by its row number,
+without failing the whole upload.
+"""
+import json
+
+from src.schemas import ChannelType
+
+
+def contact(last_name: str, *channels: tuple[int, str]) -> dict:
+    return {
+        "first_name": "Import",
+        "last_name": last_name,
+        "birthdate": "1990-05-17",
+        "gender": "F",
+        "persuasion": "none",
+        "channels": [
+            {"channel_id": channel_id, "channel_value": value}
+            for channel_id, value in channels
+        ],
+    }
+
+
+async def upload(client, headers: dict, data: str, import_format: str = "ndjson"):
+    return await client.post(
+        f"/api/contacts/bulk?format={import_format}",
+        headers=headers,
+        files={"file": (f"contacts.{import_format}", data.encode())},
+    )
+
+
+async def test_duplicate_value_within_a_row_reports_only_that_row(
+    client, seeded, auth_headers
+):
+    phone = seeded.channel_ids[ChannelType.PHONE.value]
+    post = seeded.channel_ids[ChannelType.POST.value]
+    records = [
+        contact("Twice", (phone, "+381600000001"), (post, "+381600000001")),
+        contact("Once", (phone, "+381600000002"), (post, "Import street 2")),
+        contact("Again", (phone, "+381600000002")),
+    ]
+
+    response = await upload(
+        client, auth_headers, "\n".join(json.dumps(record) for record in records)
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "created": 1,
+        "errors": [
+            {"row": 1, "error": "Channel value '+381600000001' already exists"},
+            {"row": 3, "error": "Channel value '+381600000002' already exists"},
+        ],
+    }
+
+
+async def test_csv_row_with_extra_fields_is_reported(client, seeded, auth_headers):
+    data = (
+        "first_name,last_name,birthdate,gender,persuasion\r\n"
+        "Import,Extra,1990-05-17,F,none,surplus\r\n"
+        "Import,Csv,1990-05-17,F,none\r\n"
+    )
+
+    response = await upload(client, auth_headers, data, "csv")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "created": 1,
+        "errors": [{"row": 1, "error": "Row has more fields than the header"}],
+    }
@@ -0,0 +1,74 @@
+import calendar
+from datetime import date, timedelta
+
+import pytest
+
+from src.utils.dates import birthday_day_of_year, get_birthday_ranges
+
+
+def celebrated_days(today: date, days: int) -> set[int]:
+    """
+    Expected 'birthday_day_of_year' values, computed day by day: in a non-leap year
+    the birthdays of February 29 are celebrated on February 28.
+    """
+    result = set()
+    for offset in range(days + 1):
+        day = today + timedelta(days=offset)
+        result.add(birthday_day_of_year(day))
+        if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+            result.add(birthday_day_of_year(date(2000, 2, 29)))
+    return result
+
+
+def range_days(ranges: list[tuple[int, int]]) -> set[int]:
+    return {day for start, end in ranges for day in range(start, end + 1)}
+
+
+def test_birthday_day_of_year_counts_in_leap_year():
+    assert birthday_day_of_year(date(1990, 2, 28)) == 59
+    assert birthday_day_of_year(date(1992, 2, 29)) == 60
+    assert birthday_day_of_year(date(1990, 3, 1)) == 61
+    assert birthday_day_of_year(date(1990, 12, 31)) == 366
+
+
+def test_window_inside_year():
+    assert get_birthday_ranges(7, today=date(2023, 5, 10)) == [(131, 138)]
+
+
+def test_window_wraps_year_end():
+    ranges = get_birthday_ranges(10, today=date(2023, 12, 25))
+    assert ranges == [(360, 366), (1, 4)]
+
+
+@pytest.mark.parametrize(
+    "today, days, included",
+    [
+        # the last day of the window is February 28 of a non-leap year
+        (date(2023, 2, 20), 8, True),
+        (date(2023, 2, 20), 7, False),
+        # in a leap year February 29 is a day of its own
+        (date(2024, 2, 20), 9, True),
+        (date(2024, 2, 20), 8, False),
+        (date(2024, 3, 1), 30, False),
+    ],
+)
+def test_february_29(today, days, included):
+    assert (60 in range_days(get_birthday_ranges(days, today=today))) is included
+
+
+def test_window_edges():
+    today = date(2023, 6, 15)
+    assert get_birthday_ranges(0, today=today) == [(167, 167)]
+    assert get_birthday_ranges(-1, today=today) == []
+    assert get_birthday_ranges(365, today=today) == [(1, 366)]
+
+
+@pytest.mark.parametrize("year", [2023, 2024])
+@pytest.mark.parametrize("days", [0, 1, 6, 30, 59, 200, 364])
+def test_matches_day_by_day_window(year, days):
+    start = date(year, 1, 1)
+    for offset in range(0, 366, 3):
+        today = start + timedelta(days=offset)
+        assert range_days(get_birthday_ranges(days, today=today)) == celebrated_days(
+            today, days
+        ), today
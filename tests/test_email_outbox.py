@@ -0,0 +1,52 @@
+"""
+A failed delivery is retried whatever the exception, a job which can't be read goes
+to the dead letter list, and a signup doesn't fail when the outbox is unavailable.
+Every test runs its own outbox on a separate fakeredis server, the app's worker
+drains the shared one.
+"""
+import json
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from src.services import email
+from src.services.email import DEAD_KEY, DELAYED_KEY, EmailOutbox, SMTPPool
+
+
+@pytest.fixture
+def outbox() -> EmailOutbox:
+    return EmailOutbox(FakeRedis(server=FakeServer()), SMTPPool(1))
+
+
+async def test_unexpected_delivery_error_is_retried(outbox, monkeypatch):
+    async def send(message):
+        raise RuntimeError("template or transport failure")
+
+    monkeypatch.setattr(outbox.pool, "send", send)
+    await outbox.enqueue("retry@example.com", "Retry User", "http://test/")
+
+    assert await outbox.drain() == 1
+
+    jobs = await outbox.client.zrange(DELAYED_KEY, 0, -1)
+    assert [json.loads(job)["attempts"] for job in jobs] == [1]
+    assert outbox.failed == 1
+
+
+async def test_malformed_job_is_dead_lettered(outbox):
+    await outbox.client.rpush(email.OUTBOX_KEY, "not json", '["a", "list"]')
+
+    assert await outbox.drain() == 2
+
+    assert await outbox.client.zcard(DELAYED_KEY) == 0
+    assert await outbox.client.lrange(DEAD_KEY, 0, -1) == [
+        b"not json",
+        b'["a", "list"]',
+    ]
+
+
+async def test_send_email_survives_unavailable_redis(outbox, monkeypatch):
+    outbox.client.connection_pool.connection_kwargs["server"].connected = False
+    monkeypatch.setattr(email, "email_outbox", outbox)
+
+    await email.send_email("down@example.com", "Down User", "http://test/")
@@ -0,0 +1,78 @@
+"""
+Per-user reads carry a weak ETag of the user's data version: a client holding it gets
+304 before any query runs, and every mutation of a contact or a contact channel
+changes it.
+"""
+from src.schemas import ChannelType
+from src.services.profiler import query_budget
+
+NEW_CONTACT = {
+    "first_name": "Etag",
+    "last_name": "Changed",
+    "birthdate": "1990-05-17",
+    "gender": "M",
+    "persuasion": "none",
+    "created_at": "2024-01-01T12:00:00",
+}
+
+
+async def current_etag(client, headers: dict, url: str) -> str:
+    response = await client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+async def test_matching_etag_is_not_modified_without_queries(client, auth_headers):
+    etag = await current_etag(client, auth_headers, "/api/contacts/?limit=5")
+
+    with query_budget(0) as profile:
+        response = await client.get(
+            "/api/contacts/?limit=5", headers={**auth_headers, "If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    assert profile.statements == 0
+
+
+async def test_contact_mutation_changes_the_etag(client, auth_headers):
+    etag = await current_etag(client, auth_headers, "/api/contacts/?limit=5")
+
+    response = await client.post(
+        "/api/contacts/", headers=auth_headers, json=NEW_CONTACT
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        "/api/contacts/?limit=5", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_contact_channel_mutation_changes_the_etag(
+    client, seeded, auth_headers
+):
+    contact = (
+        await client.post("/api/contacts/", headers=auth_headers, json=NEW_CONTACT)
+    ).json()
+    urls = ("/api/contactsChannels/?limit=5", "/api/contacts/?limit=5")
+    etags = [await current_etag(client, auth_headers, url) for url in urls]
+
+    response = await client.post(
+        "/api/contactsChannels/",
+        headers=auth_headers,
+        json={
+            "contact_id": contact["id"],
+            "channel_id": seeded.channel_ids[ChannelType.PHONE.value],
+            "channel_value": "+380500000013",
+        },
+    )
+    assert response.status_code == 200
+
+    for url, etag in zip(urls, etags):
+        headers = {**auth_headers, "If-None-Match": etag}
+        response = await client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
@@ -0,0 +1,69 @@
+"""
+The read endpoints stay within a fixed number of SQL statements per request, however
+many rows the user has. The query strings differ between the tests, so a request is
+not answered from the response cache of an earlier one.
+"""
+import pytest
+
+from src.services.profiler import query_budget
+
+
+@pytest.mark.parametrize("limit", [1, 100, 1000])
+async def test_contacts_page_is_one_query(client, seeded, auth_headers, limit):
+    with query_budget(1) as profile:
+        response = await client.get(
+            f"/api/contacts/?limit={limit}", headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == limit
+    assert profile.statements == 1
+
+
+async def test_contacts_next_page_is_one_query(client, seeded, auth_headers):
+    first = await client.get("/api/contacts/?limit=50", headers=auth_headers)
+    cursor = first.json()["next_cursor"]
+
+    with query_budget(1) as profile:
+        response = await client.get(
+            f"/api/contacts/?limit=50&cursor={cursor}", headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 50
+    assert profile.statements == 1
+
+
+@pytest.mark.parametrize("limit", [1, 100, 1000])
+async def test_contacts_channels_page_is_one_query(
+    client, seeded, auth_headers, limit
+):
+    with query_budget(1) as profile:
+        response = await client.get(
+            f"/api/contactsChannels/?limit={limit}", headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == limit
+    assert profile.statements == 1
+
+
+async def test_channels_are_served_without_queries(client, seeded, auth_headers):
+    with query_budget(0):
+        response = await client.get("/api/channels/", headers=auth_headers)
+        channel_id = response.json()[0]["id"]
+        single = await client.get(f"/api/channels/{channel_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert single.status_code == 200
+
+
+@pytest.mark.parametrize("days", [1, 45, 365])
+async def test_birthdays_is_one_query(client, seeded, auth_headers, days):
+    with query_budget(1) as profile:
+        response = await client.get(
+            f"/api/contacts/birthdays?daysForward={days}", headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    assert profile.statements == 1
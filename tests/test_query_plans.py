@@ -0,0 +1,106 @@
+"""
+Query-plan regression tests: the hot per-user queries must be served by an index,
+not by a sequential scan of the table.
+"""
+import pytest
+from sqlalchemy import and_, or_, select, text
+
+from src.database.models import Contact, ContactChannel
+from src.repository.contacts import _contacts_conditions
+from src.repository.projections import CONTACT_CHANNEL_ROW_COLUMNS, CONTACT_ROW_COLUMNS
+from src.utils.dates import get_birthday_ranges
+
+
+async def explain(db, query) -> str:
+    dialect = db.bind.dialect
+    # the planner picks between the indexes by the table statistics
+    await db.execute(text("ANALYZE"))
+    sql = str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "sqlite":
+        rows = await db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))
+        return "\n".join(row.detail for row in rows)
+    # small test tables are cheaper to scan, make the planner use any usable index
+    await db.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = await db.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(row[0] for row in rows)
+
+
+def assert_no_full_scan(plan: str, table: str) -> None:
+    lines = plan.splitlines()
+    # SQLite: "SCAN contacts" without "USING ... INDEX"; Postgres: "Seq Scan on"
+    assert not [
+        line
+        for line in lines
+        if (line.startswith(f"SCAN {table}") and "INDEX" not in line)
+        or f"Seq Scan on {table}" in line
+    ], plan
+
+
+def contacts_page(user_id: int, **filters):
+    conditions = _contacts_conditions(
+        user_id,
+        filters.get("firstName"),
+        filters.get("lastName"),
+        filters.get("email"),
+        None,
+    )
+    return (
+        select(*CONTACT_ROW_COLUMNS)
+        .where(and_(*conditions))
+        .order_by(Contact.created_at, Contact.id)
+        .limit(101)
+    )
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        (lambda uid: contacts_page(uid), "ix_contacts_created_by_created_at_id"),
+        (
+            lambda uid: contacts_page(uid, lastName="Kovalenko", firstName="Olena"),
+            "ix_contacts_created_by_last_name_first_name",
+        ),
+        (
+            lambda uid: select(*CONTACT_ROW_COLUMNS).where(
+                (Contact.created_by == uid)
+                & or_(
+                    *(
+                        Contact.birthday_doy.between(start, end)
+                        for start, end in get_birthday_ranges(30)
+                    )
+                )
+            ),
+            "ix_contacts_created_by_birthday_doy",
+        ),
+        (
+            lambda uid: select(*CONTACT_CHANNEL_ROW_COLUMNS)
+            .where(ContactChannel.created_by == uid)
+            .order_by(ContactChannel.id)
+            .limit(101),
+            "ix_contacts_channels_created_by_id",
+        ),
+        (
+            lambda uid: select(ContactChannel.id).where(
+                ContactChannel.contact_id.in_([1, 2, 3])
+            ),
+            "ix_contacts_channels_contact_id",
+        ),
+        (
+            lambda uid: select(ContactChannel.id).where(ContactChannel.channel_id == 1),
+            "ix_contacts_channels_channel_id",
+        ),
+    ],
+)
+async def test_hot_queries_use_index(db, seeded, query, index):
+    plan = await explain(db, query(seeded.user_ids[0]))
+
+    assert index in plan, plan
+    assert_no_full_scan(plan, "contacts")
+    assert_no_full_scan(plan, "contacts_channels")
+
+
+async def test_email_filter_uses_channel_index(db, seeded):
+    plan = await explain(db, contacts_page(seeded.user_ids[0], email="a@example.com"))
+
+    assert_no_full_scan(plan, "contacts")
+    assert_no_full_scan(plan, "contacts_channels")
@@ -0,0 +1,21 @@
+"""
+The duration of a statement is measured by the engine listeners in 'src.database.db',
+a failed statement must not leave its start time behind.
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.database.db import engine
+from src.services.profiler import query_budget
+
+
+async def test_failed_statement_pops_start_time(client):
+    async with engine.connect() as connection:
+        with query_budget(10) as profile:
+            with pytest.raises(OperationalError):
+                await connection.execute(text("SELECT * FROM missing_table"))
+            await connection.execute(text("SELECT 1"))
+        info = connection.sync_connection.info
+        assert not info.get("query_start_time")
+    assert profile.statements == 2
@@ -0,0 +1,39 @@
+"""
+Authorized requests are limited per user, also with tokens issued before the 'uid'
+claim was added.
+"""
+import pytest
+from fastapi_jwt_auth import AuthJWT
+from starlette.requests import Request
+
+from src.services.rate_limit import RateLimiter
+
+
+def make_request(email: str, user_id: int | None) -> Request:
+    claims = {"uid": user_id} if user_id is not None else {}
+    token = AuthJWT().create_access_token(subject=email, user_claims=claims)
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/contacts/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+            "client": ("10.0.0.1", 50000),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "user_id, identity", [(7, "user:7"), (None, "user:legacy@example.com")]
+)
+async def test_identity_of_a_token(client, user_id, identity):
+    request = make_request("legacy@example.com", user_id)
+
+    assert await RateLimiter.identity(request) == identity
+
+
+async def test_legacy_tokens_of_different_users_do_not_share_a_bucket(client):
+    first = await RateLimiter.identity(make_request("first@example.com", None))
+    second = await RateLimiter.identity(make_request("second@example.com", None))
+
+    assert first != second
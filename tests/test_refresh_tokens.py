@@ -0,0 +1,36 @@
+"""
+Revoking all sessions of a user rejects every refresh token issued before, however
+long ago the previous revocation was.
+"""
+import asyncio
+
+from src.database.redis_client import redis_client
+from src.services.refresh_tokens import RefreshTokenStore
+
+
+async def test_revoke_all_rejects_tokens_after_an_old_revocation(client):
+    store = RefreshTokenStore(redis_client, ttl=3)
+    user_id, family = 9001, store.new_family()
+
+    await store.revoke_all(user_id)
+    await asyncio.sleep(1)
+    await store.add(user_id, family, "first")
+    assert await store.rotate(user_id, family, "first")
+    await store.add(user_id, family, "second")
+
+    # the generation of the first revocation would have expired by now if it
+    # expired with the tokens, while the second token is still valid
+    await asyncio.sleep(2.1)
+    assert await redis_client.ttl(store.generation_key(user_id)) == -1
+    await store.revoke_all(user_id)
+
+    assert not await store.rotate(user_id, family, "second")
+
+
+async def test_rotation_consumes_the_token(client):
+    store = RefreshTokenStore(redis_client, ttl=60)
+    user_id, family = 9002, store.new_family()
+    await store.add(user_id, family, "token")
+
+    assert await store.rotate(user_id, family, "token")
+    assert not await store.rotate(user_id, family, "token")
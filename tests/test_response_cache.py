@@ -0,0 +1,46 @@
+"""
+Read endpoints keep their serialized body in Redis under the user's data version: a
+repeated request is served without a query and a write makes the next read miss.
+"""
+from src.services import response_cache
+from src.services.profiler import query_budget
+
+URL = "/api/contacts/?firstName=Cached&limit=7"
+
+
+async def test_repeated_read_is_a_cache_hit(client, auth_headers):
+    first = await client.get(URL, headers=auth_headers)
+    hits = response_cache.stats.hits
+
+    with query_budget(0) as profile:
+        second = await client.get(URL, headers=auth_headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert response_cache.stats.hits == hits + 1
+    assert profile.statements == 0
+
+
+async def test_write_invalidates_the_cached_response(client, auth_headers):
+    await client.get(URL, headers=auth_headers)
+    assert (await client.get(URL, headers=auth_headers)).json()["items"] == []
+
+    response = await client.post(
+        "/api/contacts/",
+        headers=auth_headers,
+        json={
+            "first_name": "Cached",
+            "last_name": "Invalidated",
+            "birthdate": "1990-05-17",
+            "gender": "F",
+            "persuasion": "none",
+            "created_at": "2024-01-01T12:00:00",
+        },
+    )
+    assert response.status_code == 200
+    misses = response_cache.stats.misses
+
+    response = await client.get(URL, headers=auth_headers)
+
+    assert response_cache.stats.misses == misses + 1
+    assert [item["last_name"] for item in response.json()["items"]] == ["Invalidated"]
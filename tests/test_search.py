@@ -0,0 +1,110 @@
+"""
+Search ranks prefix matches before substring matches before typos, also matches
+channel values, only returns the contacts of the user and pages by an offset cursor.
+"""
+from datetime import date, datetime
+
+import pytest
+
+from benchmarks import harness
+from src.database.models import Contact, ContactChannel
+from src.schemas import ChannelType
+from src.utils.pagination import encode_cursor
+
+
+@pytest.fixture(scope="session")
+async def search_contacts(seeded) -> dict[str, int]:
+    contacts = {
+        # name: (owner, channel value)
+        "Zyqwuxina": (seeded.user_ids[0], None),  # prefix of 'zyqwux'
+        "Amzyqwux": (seeded.user_ids[0], None),  # contains 'zyqwux'
+        "Zyqix": (seeded.user_ids[0], None),  # a typo away
+        "Zyqwuxon": (seeded.user_ids[1], None),  # another user's
+        "Hotline": (seeded.user_ids[0], "hotline-hk4@vbt.example.com"),
+    }
+    ids = {}
+    async with harness.SessionLocal() as db:
+        for first_name, (user_id, channel_value) in contacts.items():
+            contact = Contact(
+                first_name=first_name,
+                last_name="Searched",
+                birthdate=date(1990, 5, 17),
+                gender="F",
+                persuasion="none",
+                created_at=datetime.now(),
+                created_by=user_id,
+            )
+            db.add(contact)
+            await db.flush()
+            if channel_value:
+                db.add(
+                    ContactChannel(
+                        contact_id=contact.id,
+                        channel_id=seeded.channel_ids[ChannelType.EMAIL.value],
+                        channel_value=channel_value,
+                        created_by=user_id,
+                    )
+                )
+            ids[first_name] = contact.id
+        await db.commit()
+    return ids
+
+
+async def search(client, headers: dict, query: str):
+    response = await client.get(f"/api/contacts/search?{query}", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_prefix_then_substring_then_typo(client, auth_headers, search_contacts):
+    page = await search(client, auth_headers, "q=zyqwux")
+
+    assert [item["id"] for item in page["items"]] == [
+        search_contacts["Zyqwuxina"],
+        search_contacts["Amzyqwux"],
+        search_contacts["Zyqix"],
+    ]
+    assert page["next_cursor"] is None
+
+
+async def test_channel_value_matches(client, auth_headers, search_contacts):
+    page = await search(client, auth_headers, "q=hk4@vbt")
+
+    assert [item["id"] for item in page["items"]] == [search_contacts["Hotline"]]
+
+
+async def test_other_users_contacts_are_not_found(
+    client, seeded, auth_headers, search_contacts
+):
+    page = await search(client, auth_headers, "q=zyqwuxon")
+
+    assert search_contacts["Zyqwuxon"] not in [item["id"] for item in page["items"]]
+    assert {item["created_by"] for item in page["items"]} == {seeded.user_ids[0]}
+
+
+async def test_cursor_pages_through_the_ranking(client, auth_headers, search_contacts):
+    ids, cursor = [], None
+    for _ in range(4):
+        query = "q=zyqwux&limit=1" + (f"&cursor={cursor}" if cursor else "")
+        page = await search(client, auth_headers, query)
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert ids == [
+        search_contacts["Zyqwuxina"],
+        search_contacts["Amzyqwux"],
+        search_contacts["Zyqix"],
+    ]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(-1)])
+async def test_invalid_cursor_is_rejected(client, auth_headers, cursor):
+    response = await client.get(
+        f"/api/contacts/search?q=zyqwux&cursor={cursor}", headers=auth_headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,82 @@
+"""
+Revoked access tokens are rejected by every worker, also by one which starts after
+the revocation and never received its broadcast.
+"""
+import pytest
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import JWTDecodeError
+
+from src.conf.config import settings
+from src.database.redis_client import redis_client
+from src.services.tokens import TokenVerifier, revoked_key, token_verifier
+
+
+def new_worker_verifier() -> TokenVerifier:
+    return TokenVerifier(
+        token_verifier.secret_key,
+        token_verifier.algorithm,
+        maxsize=10,
+        client=redis_client,
+    )
+
+
+def bearer(email: str, user_id: int | None) -> str:
+    claims = {"uid": user_id} if user_id is not None else {}
+    return f"Bearer {AuthJWT().create_access_token(subject=email, user_claims=claims)}"
+
+
+async def test_revocation_is_stored_for_the_access_token_lifetime(client):
+    await token_verifier.revoke_user("stored@example.com")
+
+    ttl = await redis_client.ttl(revoked_key("stored@example.com"))
+    assert 0 < ttl <= settings.authjwt_access_token_expires
+
+
+@pytest.mark.parametrize("user_id", [101, None], ids=["uid", "legacy"])
+async def test_other_worker_rejects_revoked_token(client, user_id):
+    email = f"revoked{user_id}@example.com"
+    authorization = bearer(email, user_id)
+    assert (await new_worker_verifier().verify(authorization)).email == email
+
+    await token_verifier.revoke_user(email)
+
+    with pytest.raises(JWTDecodeError):
+        await token_verifier.verify(authorization)
+    with pytest.raises(JWTDecodeError):
+        await new_worker_verifier().verify(authorization)
+
+
+async def test_revoke_sessions_rejects_the_access_token(client, seeded):
+    tokens = (
+        await client.post(
+            "/api/auth/access_token",
+            json={"email": seeded.emails[1], "password": "secret123"},
+        )
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = await client.delete("/api/auth/sessions", headers=headers)
+    assert response.status_code == 204
+
+    response = await client.get("/api/contacts/?limit=3", headers=headers)
+    assert response.status_code == 401
+    assert await redis_client.exists(revoked_key(seeded.emails[1]))
+
+
+async def test_token_issued_right_after_revocation_is_accepted(client, seeded):
+    credentials = {"email": seeded.emails[1], "password": "secret123"}
+    tokens = (await client.post("/api/auth/access_token", json=credentials)).json()
+    response = await client.delete(
+        "/api/auth/sessions",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.status_code == 204
+
+    # usually within the same second as the revocation
+    tokens = (await client.post("/api/auth/access_token", json=credentials)).json()
+    response = await client.get(
+        "/api/contacts/?limit=3",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+
+    assert response.status_code == 200